@@ -7,6 +7,8 @@ function onOpen() {
   var ui = DocumentApp.getUi();
   ui.createMenu("Extensia GSCR")
     .addItem("Trimite tot textul la server", "sendTextToServer")
+    .addItem("Verifică tot documentul", "checkDocument")
+    .addItem("Verifică paragrafele", "checkParagraphs")
     .addItem("Trimite selecția la server", "sendSelectionToServer")
     .addItem("Vezi sugestii de corectare pentru selecție", "seeSugestionsForSelection")
     .addItem("Vezi sinonime","seeSynonyms")
@@ -249,6 +251,78 @@ function sendTextToServer() {
 }
 
 
+function checkDocument() {
+    // check the entire document; the document id lets the server re-check only the sentences edited since the last call
+  var doc = DocumentApp.getActiveDocument();
+  var body = doc.getBody();
+  var text = body.getText();
+
+  var apiUrl = `${urlDeBaza}/check`; // will be calling the check endpoint
+
+  var payload = {
+    text: text,
+    document_id: doc.getId()
+  };
+
+  var options = {
+    method: "POST",
+    contentType: "application/json",
+    payload: JSON.stringify(payload)
+  };
+
+  try {
+    var response = UrlFetchApp.fetch(apiUrl, options);
+    var jsonResponse = JSON.parse(response.getContentText());
+    var updatedText = jsonResponse.corrected;
+    if (updatedText !== text) {
+      body.setText(updatedText);
+    }
+
+  } catch (error) {
+    Logger.log("Eroare la trimiterea cererii: " + error.message);
+  }
+}
+
+
+function checkParagraphs() {
+    // check every paragraph with a single request to the batch endpoint and only rewrite the paragraphs that changed
+  var doc = DocumentApp.getActiveDocument();
+  var paragraphs = doc.getBody().getParagraphs().filter(function (p) {
+    return p.getText().trim() !== "";
+  });
+
+  var apiUrl = `${urlDeBaza}/batch`; // will be calling the batch endpoint
+
+  var payload = {
+    operations: paragraphs.map(function (p) {
+      return { op: "check", text: p.getText() };
+    })
+  };
+
+  var options = {
+    method: "POST",
+    contentType: "application/json",
+    payload: JSON.stringify(payload)
+  };
+
+  try {
+    var response = UrlFetchApp.fetch(apiUrl, options);
+    var results = JSON.parse(response.getContentText()).results;
+
+    for (var i = 0; i < paragraphs.length; i++) {
+      var updatedText = results[i].corrected;
+      if (updatedText !== paragraphs[i].getText()) {
+        paragraphs[i].setText(updatedText);
+      }
+    }
+
+  } catch (error) {
+    Logger.log("Eroare la trimiterea cererii: " + error.message);
+    DocumentApp.getUi().alert("Eroare: " + error.message);
+  }
+}
+
+
 function sendSelectionToServer() {
     // send the selected text to the server to be corrected 
   var doc = DocumentApp.getActiveDocument();
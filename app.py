@@ -1,49 +1,269 @@
 import os
-import re
+import json
+import functools
+import time
 import sys
 import pathlib
 import torch
-from flask import Flask, request, jsonify
+from concurrent.futures import as_completed
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
 from apscheduler.schedulers.background import BackgroundScheduler
 from transformers import (
     AutoTokenizer,
 )
 
-from src.wordnet.wordnet import get_related_forms
+from src.wordnet.wordnet import get_related_forms_many
 
 sys.path.append(str(pathlib.Path(__file__).parent.resolve()))
 
-from src.models import load_model, generate_corrections
+from src.models import generate_corrections_batch, generate_word_corrections_batch, load_model
+from src.quantization import load_quantized, quantize_dynamic_int8, save_quantized
+from src.serving import (
+    AdmissionController,
+    ComponentNotReady,
+    ComponentRegistry,
+    DeadlineExceeded,
+    GenerationBatcher,
+    Overloaded,
+    CorrectionCache,
+    DocumentStore,
+    SamplingProfiler,
+    SingleFlight,
+    TierPolicy,
+    Tracer,
+    check_deadline,
+    current_deadline,
+    deadline_scope,
+    model_fingerprint,
+    normalize_text,
+)
 from database.database import store_feedback, init_db
 from src.active_learning import run_active_learning
-from src.correct_word.levenshtein import recommend_corrected_word
+from src.correct_word.levenshtein import recommend_corrected_words, correct_text_tokens, load_dictionary, unknown_tokens
 from src.suggestion_ranker import rank_suggestions
 from src.preprocess.teprolin_pipeline import teprolin_preprocess
-from src.detection.detect import HFWrapperULMFiT
+from src.detection.detect import HFWrapperULMFiT, classify_sentences, split_sentences
+from src.wordnet.lexicon import load_lexicon
+from src.wordnet.literals_lookup import load_rown
+from src.serving.tiers import FULL, EMERGENCY
+from src.serving.metrics import REGISTRY, CONTENT_TYPE, model_memory_bytes, timed
 
 
 DB_PATH = "feedback.db"
 init_db(DB_PATH)
 
-# Load model here once to avoid reloading on every request
 model_path = "./t5-grammar-finetuned"
-model, tokenizer = load_model(model_path)
+# Word-level corrector trained by src/correct_word/generate_word/generate_correct_word_train.py;
+# /word falls back to it when SymSpell has too few suggestions. Words are short, so batches are wide.
+word_model_path = "./ro-word-correction"
+WORD_MODEL_NUM_SUGGESTIONS = 5
+WORD_GENERATION_MAX_BATCH_SIZE = 64
+
+# Concurrent requests share padded generate calls instead of running batch-of-1 beams
+GENERATION_MAX_BATCH_SIZE = 8
+GENERATION_MAX_WAIT_MS = 10
+GENERATION_MAX_QUEUE_SIZE = 256
+# Greedy (single-suggestion) generation, as used by /check and the reduced tier, can draft
+# tokens by copying from the input and verify several per decoder pass (src/speculative.py).
+# Off until it is measured against batched greedy: it decodes the rows of a batch one by one.
+# Never used for int8 models.
+GENERATION_SPECULATIVE = False
+
+# Bound the number of requests waiting on the models; the rest get a fast 503 + Retry-After.
+# Clients may lower (never raise) the deadline with an X-Deadline-Ms header.
+ADMISSION_MAX_DEPTH = 32
+ADMISSION_DEFAULT_DEADLINE_MS = 15000
+admission = AdmissionController(
+    max_depth=ADMISSION_MAX_DEPTH,
+    default_deadline_ms=ADMISSION_DEFAULT_DEADLINE_MS,
+)
+
+# Under load /correct and /check fall back to greedy decoding, then to dictionary-only correction.
+# Besides the admitted depth, the tier follows how long sentence generation jobs wait in the
+# batcher queue, but only once TIER_CONTENTION_DEPTH requests are in flight.
+TIER_REDUCED_DEPTH = 8
+TIER_EMERGENCY_DEPTH = 24
+TIER_CONTENTION_DEPTH = 4
+tier_policy = TierPolicy(
+    reduced_depth=TIER_REDUCED_DEPTH,
+    emergency_depth=TIER_EMERGENCY_DEPTH,
+    contention_depth=TIER_CONTENTION_DEPTH,
+)
+
+# Debug mode: a request sent with "X-Trace: 1" (or picked by TRACE_SAMPLE_RATE) records a
+# per-stage trace tree with wall and CPU time, returned under "trace" in JSON responses and
+# kept for GET /debug/traces. "X-Profile: 1" (or PROFILE_SAMPLE_RATE) dumps a cProfile or
+# torch.profiler ("torch") capture of the request into PROFILE_DIR, keeping the newest ones.
+# The headers and /debug/traces are only honoured for loopback clients, and the headers only
+# when TRACE_HEADERS_ENABLED is set; behind a reverse proxy on the same host every client
+# looks local, so leave it off there.
+TRACE_HEADERS_ENABLED = False
+TRACE_SAMPLE_RATE = 0.0
+PROFILE_SAMPLE_RATE = 0.0
+PROFILE_MODE = "cprofile"
+PROFILE_DIR = "profiles"
+tracer = Tracer(sample_rate=TRACE_SAMPLE_RATE)
+profiler = SamplingProfiler(PROFILE_DIR, sample_rate=PROFILE_SAMPLE_RATE, mode=PROFILE_MODE)
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
+# On CPU-only hosts the T5 models and the classifier can be served with int8 dynamic
+# quantization (src/quantization.py). Prepare the weights with src/quantize_model.py and
+# check the quality trade-off with src/evaluate_quantization.py first. Ignored on CUDA.
+QUANTIZE_INT8 = False
+quantize_models = QUANTIZE_INT8 and device.type == "cpu"
+
+# Backend of the two T5 models: "torch" (eager generate) or "onnx" (ONNX Runtime graphs with
+# a decoder KV cache, exported on first start; needs optimum[onnxruntime]). Check a new export
+# with tests/test_onnx_equivalence.py. int8 quantization applies to the torch backend only.
+GENERATION_BACKEND = "torch"
+quantize_generation = quantize_models and GENERATION_BACKEND == "torch"
+
+def served_fingerprint(path, backend="torch"):
+    # differently served models give different outputs, so they must not share cache entries
+    if backend == "onnx":
+        return model_fingerprint(path) + ":onnx"
+    return model_fingerprint(path) + (":int8" if quantize_models else "")
+
 clf_model_path = os.path.join(pathlib.Path(__file__).parent, "src", "detection", "content", "trained_model_V2_2")
-clf_tokenizer = AutoTokenizer.from_pretrained(clf_model_path)
-clf_model = HFWrapperULMFiT.from_pretrained(str(clf_model_path)).to(device)
-clf_model.eval()
+
+# Models, dictionaries and lexicons load in parallel background threads, so importing the
+# app is fast; every endpoint answers 503 + Retry-After until its own components are ready
+# (see GET /ready). With COMPONENTS_PRELOAD = False each one loads on first use instead.
+COMPONENTS_PRELOAD = True
+components = ComponentRegistry()
+
+def load_generation():
+    model, tokenizer = components.get("t5")
+    return GenerationBatcher(
+        model,
+        tokenizer,
+        max_batch_size=GENERATION_MAX_BATCH_SIZE,
+        max_wait_ms=GENERATION_MAX_WAIT_MS,
+        max_queue_size=GENERATION_MAX_QUEUE_SIZE,
+        generate_fn=functools.partial(generate_corrections_batch, speculative=GENERATION_SPECULATIVE),
+        on_wait=tier_policy.record_wait,
+    )
+
+def load_word_generation():
+    model, tokenizer = components.get("word_t5")
+    return GenerationBatcher(
+        model,
+        tokenizer,
+        max_batch_size=WORD_GENERATION_MAX_BATCH_SIZE,
+        max_wait_ms=GENERATION_MAX_WAIT_MS,
+        max_queue_size=GENERATION_MAX_QUEUE_SIZE,
+        generate_fn=generate_word_corrections_batch,
+        stage="word_generate",
+    )
+
+def load_classifier():
+    clf_tokenizer = AutoTokenizer.from_pretrained(clf_model_path)
+    clf_model = HFWrapperULMFiT.from_pretrained(str(clf_model_path)).to(device)
+    clf_model.eval()
+    if quantize_models:
+        clf_model = load_quantized(clf_model, clf_model_path)
+    return clf_model, clf_tokenizer
+
+components.register("t5", lambda: load_model(model_path, quantize=quantize_generation, backend=GENERATION_BACKEND))
+components.register("generation", load_generation)
+components.register("word_t5", lambda: load_model(word_model_path, quantize=quantize_generation, backend=GENERATION_BACKEND))
+components.register("word_generation", load_word_generation)
+components.register("classifier", load_classifier)
+components.register("symspell", load_dictionary)
+components.register("lexicon", load_lexicon)
+components.register("wordnet", load_rown)
+
+# Components each endpoint needs before it can answer
+ENDPOINT_COMPONENTS = {
+    "/correct":      ("generation", "symspell"),
+    "/check":        ("classifier", "generation", "symspell"),
+    "/check/stream": ("classifier", "generation", "symspell"),
+    "/word":         ("symspell", "word_generation"),
+    "/spell":        ("symspell", "word_generation"),
+    "/synonym":      ("lexicon", "wordnet"),
+    "/batch":        ("classifier", "generation", "symspell", "word_generation", "lexicon", "wordnet"),
+}
+
+# Repeated sentences are answered from an in-process LRU backed by a SQLite file
+# next to the feedback DB; entries are keyed on the model fingerprint.
+CACHE_DB_PATH = "correction_cache.db"
+generation_cache = CorrectionCache("t5", served_fingerprint(model_path, GENERATION_BACKEND), db_path=CACHE_DB_PATH)
+classifier_cache = CorrectionCache("classifier", served_fingerprint(clf_model_path), db_path=CACHE_DB_PATH)
+word_cache = CorrectionCache("word_t5", served_fingerprint(word_model_path, GENERATION_BACKEND), db_path=CACHE_DB_PATH)
+
+def generate_cached(texts, num_suggestions):
+    return generation_cache.get_or_compute_many(
+        texts,
+        {"num_suggestions": num_suggestions},
+        lambda missing: components.get("generation").generate_many(
+            missing,
+            num_suggestions=num_suggestions,
+            deadline=current_deadline(),
+        ),
+    )
+
+def generate_words_cached(words, num_suggestions):
+    return word_cache.get_or_compute_many(
+        words,
+        {"num_suggestions": num_suggestions},
+        lambda missing: components.get("word_generation").generate_many(
+            missing,
+            num_suggestions=num_suggestions,
+            deadline=current_deadline(),
+        ),
+    )
+
+def classify_missing(sentences):
+    check_deadline()
+    with timed("classifier"):
+        clf_model, clf_tokenizer = components.get("classifier")
+        return classify_sentences(sentences, clf_model, clf_tokenizer)
+
+def teprolin_clean(text):
+    with timed("teprolin"):
+        return teprolin_preprocess(text)["teprolin-result"]["text"]
+
+def classify_cached(sentences):
+    return classifier_cache.get_or_compute_many(sentences, None, classify_missing)
+
+# Per-document sentence state for revision-aware /check requests
+documents = DocumentStore()
+
+# Identical payloads arriving while the same pipeline is already running wait for its result
+in_flight = SingleFlight()
+
+def active_learning_job():
+    model, tokenizer = components.get("t5")
+    if GENERATION_BACKEND == "onnx" or quantize_generation:
+        # neither ONNX graphs nor int8 layers can be trained: fine-tune a float copy instead
+        float_model, _ = load_model(model_path)
+        run_active_learning(model=float_model, tokenizer=tokenizer, db_path=DB_PATH, output_dir=model_path)
+        if GENERATION_BACKEND == "onnx":
+            # re-exported from the new weights; the batcher picks it up from its next batch on
+            components.get("generation").model, _ = load_model(model_path, backend="onnx")
+        else:
+            quantized = quantize_dynamic_int8(float_model)
+            model.load_state_dict(quantized.state_dict())
+            save_quantized(quantized, model_path)
+            model.eval()
+    else:
+        run_active_learning(model=model, tokenizer=tokenizer, db_path=DB_PATH, output_dir=model_path)
+        model.eval()
+    # the weights were rewritten, so previous corrections are stale
+    generation_cache.set_fingerprint(served_fingerprint(model_path, GENERATION_BACKEND))
+    documents.clear()
+
+if COMPONENTS_PRELOAD:
+    components.start()
 
 # Schedule the active learning process to run every 3 days
 scheduler = BackgroundScheduler()
 scheduler.add_job(
-    run_active_learning,
+    active_learning_job,
     'interval',
     days=3,
-    kwargs={"model": model, "tokenizer": tokenizer, "db_path": "feedback.db"}
 )
 scheduler.start()
 
@@ -51,6 +271,104 @@ app = Flask(__name__)
 
 CORS(app, supports_credentials=True, resources={r"/*": {"origins": "*"}})
 
+REQUESTS = REGISTRY.counter("gscr_requests_total", "HTTP requests by endpoint and status.", ["endpoint", "status"])
+REQUEST_SECONDS = REGISTRY.histogram("gscr_request_seconds", "HTTP request latency by endpoint.", ["endpoint"])
+REGISTRY.callback(
+    "gscr_queue_depth",
+    "Requests admitted to the inference path and texts waiting for generation.",
+    lambda: [
+        ({"queue": "admission"}, admission.depth()),
+        ({"queue": "generation"}, generation_pending()),
+        ({"queue": "word_generation"}, generation_pending("word_generation")),
+    ],
+    labelnames=["queue"],
+)
+REGISTRY.callback(
+    "gscr_cache_events_total",
+    "Correction cache lookups by cache and outcome.",
+    lambda: [
+        ({"cache": name, "outcome": outcome}, value)
+        for name, cache in (("generation", generation_cache), ("classifier", classifier_cache), ("word", word_cache))
+        for outcome, value in cache.stats().items() if outcome != "entries"
+    ],
+    kind="counter",
+    labelnames=["cache", "outcome"],
+)
+REGISTRY.callback(
+    "gscr_coalesced_requests_total",
+    "Requests answered by an identical request already in flight.",
+    lambda: [({}, in_flight.coalesced)],
+    kind="counter",
+)
+REGISTRY.callback(
+    "gscr_rejected_requests_total",
+    "Requests rejected by admission control.",
+    lambda: [({}, admission.rejected)],
+    kind="counter",
+)
+REGISTRY.callback(
+    "gscr_model_memory_bytes",
+    "Memory held by model parameters and buffers.",
+    lambda: [
+        ({"model": name}, model_memory_bytes(loaded[0]))
+        for name in ("t5", "word_t5", "classifier")
+        for loaded in [components.peek(name)] if loaded is not None and isinstance(loaded[0], torch.nn.Module)
+    ],
+    labelnames=["model"],
+)
+REGISTRY.callback(
+    "gscr_component_ready",
+    "1 once a model or lexicon component has finished loading.",
+    lambda: [({"component": name}, int(state["state"] == "ready")) for name, state in components.status().items()],
+    labelnames=["component"],
+)
+
+def is_local_request():
+    return request.remote_addr in ("127.0.0.1", "::1")
+
+def debug_header(name):
+    return TRACE_HEADERS_ENABLED and is_local_request() and request.headers.get(name) == "1"
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.before_request
+def start_debug_capture():
+    if tracer.should_trace(debug_header("X-Trace")):
+        g.trace = tracer.start(request.path, method=request.method)
+    if profiler.should_profile(debug_header("X-Profile")):
+        g.profile = profiler.start()
+
+@app.after_request
+def finish_debug_capture(response):
+    if g.get("profile") is not None:
+        path = profiler.stop(g.pop("profile"), request.path.strip("/").replace("/", "_") or "root")
+        response.headers["X-Profile-File"] = os.path.basename(path)
+    if "trace" in g:
+        trace = tracer.finish(*g.pop("trace"))
+        response.headers["X-Trace-Id"] = trace["id"]
+        payload = response.get_json(silent=True) if response.is_json else None
+        if isinstance(payload, dict):
+            response.set_data(app.json.dumps({**payload, "trace": trace}))
+    return response
+
+@app.teardown_request
+def discard_debug_capture(exc):
+    # after_request does not run when a request fails before it
+    if g.get("profile") is not None:
+        profiler.stop(g.pop("profile"), "failed")
+    if "trace" in g:
+        tracer.finish(*g.pop("trace"))
+
+@app.after_request
+def record_request(response):
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    REQUESTS.inc(endpoint=endpoint, status=response.status_code)
+    if "request_started" in g:
+        REQUEST_SECONDS.observe(time.perf_counter() - g.request_started, endpoint=endpoint)
+    return response
+
 @app.after_request
 def add_cors_headers(response):
     """
@@ -64,9 +382,48 @@ def add_cors_headers(response):
         response.headers["Access-Control-Allow-Credentials"] = "true"
     
     response.headers["Access-Control-Allow-Methods"] = "POST, OPTIONS"
-    response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization"
+    response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, X-Deadline-Ms, X-Trace, X-Profile"
     return response
 
+@app.errorhandler(Overloaded)
+@app.errorhandler(DeadlineExceeded)
+@app.errorhandler(ComponentNotReady)
+def service_unavailable(error):
+    response = jsonify({"error": str(error)})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(error.retry_after)
+    return add_cors_headers(response)
+
+def request_deadline_ms():
+    return request.headers.get("X-Deadline-Ms", type=float)
+
+def generation_pending(name="generation"):
+    batcher = components.peek(name)
+    return batcher.pending() if batcher is not None else 0
+
+def requires_components(view):
+    """
+    Answer 503 + Retry-After until the components listed for the endpoint are loaded.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        components.require(*ENDPOINT_COMPONENTS[request.url_rule.rule])
+        return view(*args, **kwargs)
+    return wrapper
+
+def admitted(view):
+    """
+    Run the view inside an admission slot carrying the request deadline.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with admission.admit(request_deadline_ms()):
+            return view(*args, **kwargs)
+    return wrapper
+
+def select_tier():
+    return tier_policy.select(admission.depth())
+
 @app.route('/correct', methods=['OPTIONS'])
 def preflight():
     """
@@ -76,27 +433,110 @@ def preflight():
     response = jsonify({"message": "CORS preflight successful"})
     return add_cors_headers(response)
 
+def correct_texts(texts, tier=FULL):
+    """
+    /correct pipeline for several texts at the given quality tier:
+    - full: TEPROLIN cleanup, one batched beam-search request and BLEU ranking
+    - reduced: TEPROLIN cleanup and one batched greedy request
+    - emergency: dictionary-based token correction only
+    """
+    if tier == EMERGENCY:
+        with timed("token_correction"):
+            corrected = [correct_text_tokens(text) for text in texts]
+        return [
+            {"original": text, "corrected": c, "suggestions": [c]}
+            for text, c in zip(texts, corrected)
+        ]
+
+    num_suggestions = 5 if tier == FULL else 1
+    cleaned = [teprolin_clean(text) for text in texts]
+    results = []
+    for text, corrected_text, raw_suggestions in zip(texts, cleaned, generate_cached(cleaned, num_suggestions=num_suggestions)):
+        if tier == FULL:
+            with timed("rank"):
+                ranked = rank_suggestions(original=text, suggestions=raw_suggestions, metric="bleu")
+            suggestions = [s for s, _ in ranked]
+        else:
+            suggestions = list(raw_suggestions)
+        corrected   = suggestions[0] if suggestions else corrected_text
+        results.append({
+            "original":    text,
+            "corrected":   corrected,
+            "suggestions": suggestions
+        })
+    return results
+
 @app.route('/correct', methods=['POST'])
+@requires_components
+@admitted
 def correct_text():
     data = request.get_json(force=True)
     text = data.get("text")
     if data is None or "text" not in data:
         return jsonify({"error": "Invalid request, 'text' key missing"}), 400
 
-    teprolin_result = teprolin_preprocess(text)
-    corrected_text = teprolin_result["teprolin-result"]["text"]
-    raw_suggestions = generate_corrections(model, tokenizer, corrected_text, num_suggestions=5)
-    ranked = rank_suggestions(original=text, suggestions=raw_suggestions, metric="bleu")
-    suggestions = [s for s, _ in ranked]
-    corrected   = suggestions[0] if suggestions else corrected_text
-
-    return add_cors_headers(jsonify({
-        "original":    text,
-        "corrected":   corrected,
-        "suggestions": suggestions
-    }))
+    tier = select_tier()
+    result = in_flight.do(
+        ("correct", normalize_text(text)),
+        lambda: {**correct_texts([text], tier)[0], "tier": tier},
+    )
+    return add_cors_headers(jsonify({**result, "original": text}))
     
+def check_sentences(sentences, tier=FULL):
+    """
+    Classify every sentence in bucketed batches, then correct only the ones
+    flagged as incorrect with a single batched generation request.
+    /check always decodes greedily, so the full and reduced tiers behave the same;
+    the emergency tier skips both models and corrects tokens against the dictionary.
+    Returns the per-sentence verdicts (True = correct) and their corrections.
+    """
+    if tier == EMERGENCY:
+        with timed("token_correction"):
+            corrections = [correct_text_tokens(sent) for sent in sentences]
+        return [c == sent for c, sent in zip(corrections, sentences)], corrections
+
+    verdicts = [pred == 0 for pred in classify_cached(sentences)]
+    corrections = list(sentences)
+
+    flagged = [i for i, is_correct in enumerate(verdicts) if not is_correct]
+    cleaned = [teprolin_clean(sentences[i]) for i in flagged]
+    for i, text, raw in zip(flagged, cleaned, generate_cached(cleaned, num_suggestions=1)):
+        corrections[i] = raw[0] if raw else text
+
+    return verdicts, corrections
+
+def join_sentences(text, spans, sentences):
+    # Put the corrected sentences back between the original separators
+    parts = []
+    prev_end = 0
+    for (start, end), sent in zip(spans, sentences):
+        parts.append(text[prev_end:start])
+        parts.append(sent)
+        prev_end = end
+    parts.append(text[prev_end:])
+    return "".join(parts)
+
+def check_document(document_id, sentences, tier=FULL):
+    """
+    Revision-aware check: only sentences that are new or changed since the
+    document's previous /check go through the classifier and T5.
+    Emergency-tier results are returned but not remembered.
+    Returns one {"correct", "corrected"} result per sentence and how many were re-checked.
+    """
+    results = documents.lookup(document_id, sentences)
+    todo = [i for i, r in enumerate(results) if r is None]
+
+    verdicts, corrections = check_sentences([sentences[i] for i in todo], tier)
+    for i, is_correct, corrected in zip(todo, verdicts, corrections):
+        results[i] = {"correct": is_correct, "corrected": corrected}
+
+    if tier != EMERGENCY:
+        documents.update(document_id, sentences, results)
+    return results, len(todo)
+
 @app.route('/check', methods=['POST'])
+@requires_components
+@admitted
 def check_and_correct_text():
     data = request.get_json(force=True)
     text = data.get("text")
@@ -104,23 +544,129 @@ def check_and_correct_text():
         return jsonify({"error": "Invalid request, 'text' key missing"}), 400
 
     # Split input into sentences
-    sentences = re.split(r'(?<=[\.\!\?])\s+', text)
-    corrected_sentences = []
-
-    for sent in sentences:
-        result = clf_model(**clf_tokenizer(sent, return_tensors="pt", truncation=True, padding=True).to(device))
-        is_correct = (torch.argmax(result['logits'], dim=1).item() == 0)
-        if is_correct:
-            corrected_sentences.append(sent)
+    spans = split_sentences(text)
+    sentences = [text[start:end] for start, end in spans]
+
+    tier = select_tier()
+    document_id = data.get("document_id")
+    if document_id:
+        # a coalesced request reports the tier of the request that actually ran
+        results, rechecked, tier = in_flight.do(
+            ("check", text, str(document_id)),
+            lambda: (*check_document(str(document_id), sentences, tier), tier),
+        )
+        corrected = join_sentences(text, spans, [r["corrected"] for r in results])
+        return add_cors_headers(jsonify({
+            "corrected":   corrected,
+            "tier":        tier,
+            "document_id": document_id,
+            "rechecked":   rechecked,
+            "sentences": [
+                {"start": start, "end": end, **r}
+                for (start, end), r in zip(spans, results)
+            ],
+        }))
+
+    # the corrected text keeps the original separators, so only exact repeats are coalesced
+    corrected_sentences, tier = in_flight.do(("check", text), lambda: (check_sentences(sentences, tier)[1], tier))
+
+    corrected = join_sentences(text, spans, corrected_sentences)
+    return add_cors_headers(jsonify({"corrected": corrected, "tier": tier}))
+
+def stream_check(text, document_id=None, deadline=None, tier=FULL):
+    """
+    Generator behind /check/stream: yields one NDJSON line per sentence as soon
+    as its result is known. Sentences already known for the document and the ones
+    the classifier accepts come first; flagged sentences follow in the order their
+    generation finishes. Generation still queued when the client disconnects is cancelled.
+    The emergency tier corrects tokens against the dictionary instead and, as in
+    check_document, its results are not remembered.
+    """
+    # the body runs after the view returned, so it carries the request deadline itself
+    with deadline_scope(deadline):
+        spans = split_sentences(text)
+        sentences = [text[start:end] for start, end in spans]
+        if document_id:
+            results = documents.lookup(document_id, sentences)
         else:
-            teprolin_result = teprolin_preprocess(sent)
-            cleaned = teprolin_result["teprolin-result"]["text"]
-            raw = generate_corrections(model, tokenizer, cleaned, num_suggestions=1)
-            suggestion = raw[0] if raw else cleaned
-            corrected_sentences.append(suggestion)
+            results = [None] * len(sentences)
+
+        def event(i):
+            start, end = spans[i]
+            return json.dumps({"index": i, "start": start, "end": end, **results[i]}, ensure_ascii=False) + "\n"
+
+        for i, r in enumerate(results):
+            if r is not None:
+                yield event(i)
+
+        todo = [i for i, r in enumerate(results) if r is None]
+        params = {"num_suggestions": 1}
+        pending = {}
+        try:
+            check_deadline()
+            flagged = []
+            if tier == EMERGENCY:
+                for i in todo:
+                    with timed("token_correction"):
+                        corrected = correct_text_tokens(sentences[i])
+                    results[i] = {"correct": corrected == sentences[i], "corrected": corrected}
+                    yield event(i)
+            else:
+                for i, pred in zip(todo, classify_cached([sentences[i] for i in todo])):
+                    if pred == 0:
+                        results[i] = {"correct": True, "corrected": sentences[i]}
+                        yield event(i)
+                    else:
+                        flagged.append(i)
+
+            for i in flagged:
+                cleaned = teprolin_clean(sentences[i])
+                raw = generation_cache.get(cleaned, params)
+                if raw is not None:
+                    results[i] = {"correct": False, "corrected": raw[0] if raw else cleaned}
+                    yield event(i)
+                else:
+                    pending[components.get("generation").submit(cleaned, num_suggestions=1, deadline=deadline)] = (i, cleaned)
+
+            for future in as_completed(pending):
+                i, cleaned = pending[future]
+                raw = future.result()
+                generation_cache.set(cleaned, params, raw)
+                results[i] = {"correct": False, "corrected": raw[0] if raw else cleaned}
+                yield event(i)
+        except (Overloaded, DeadlineExceeded) as error:
+            # the status line is already sent, so report it in-band
+            yield json.dumps({"error": str(error)}) + "\n"
+            return
+        finally:
+            # no-op for finished jobs; drops queued work of a client that went away
+            for future in pending:
+                future.cancel()
+
+        if document_id and tier != EMERGENCY:
+            documents.update(document_id, sentences, results)
+
+        corrected = join_sentences(text, spans, [r["corrected"] for r in results])
+        yield json.dumps({"done": True, "corrected": corrected, "tier": tier}, ensure_ascii=False) + "\n"
+
+@app.route('/check/stream', methods=['POST'])
+@requires_components
+def check_and_correct_text_stream():
+    data = request.get_json(force=True)
+    if data is None or "text" not in data:
+        return jsonify({"error": "Invalid request, 'text' key missing"}), 400
 
-    corrected = "".join(corrected_sentences)
-    return add_cors_headers(jsonify({"corrected": corrected}))
+    # the slot is held until the stream is closed, not just until this view returns
+    deadline = admission.acquire(request_deadline_ms())
+    try:
+        document_id = data.get("document_id")
+        lines = stream_check(data["text"], str(document_id) if document_id else None, deadline, select_tier())
+        response = Response(stream_with_context(lines), mimetype="application/x-ndjson")
+    except BaseException:
+        admission.release()
+        raise
+    response.call_on_close(admission.release)
+    return add_cors_headers(response)
 
 @app.route('/feedback', methods=['POST'])
 def feedback():
@@ -132,27 +678,99 @@ def feedback():
     if not orig or chosen is None:
         return jsonify({"error": "Insufficient payload"}), 400
 
-    store_feedback(original=orig,
-                   suggestions=suggestions,
-                   chosen=chosen,
-                   db_path="feedback.db")
+    with timed("sqlite"):
+        store_feedback(original=orig,
+                       suggestions=suggestions,
+                       chosen=chosen,
+                       db_path="feedback.db")
 
     return add_cors_headers(jsonify({"status": "ok"}))
 
+def suggest_words(words, num_suggestions=5, use_model=True):
+    """
+    /word pipeline for several words: SymSpell suggestions for each word, then the
+    words that got fewer than `num_suggestions` go to the word-level model together
+    (unless `use_model` is off, e.g. in the emergency tier).
+    """
+    with timed("symspell"):
+        suggestions = recommend_corrected_words(words, num_suggestions=num_suggestions)
+    if not use_model:
+        return suggestions
+
+    short = [i for i, s in enumerate(suggestions) if len(s) < num_suggestions]
+    model_suggestions = generate_words_cached([words[i] for i in short], num_suggestions=WORD_MODEL_NUM_SUGGESTIONS)
+    for i, extras in zip(short, model_suggestions):
+        extras = [s for s in extras if s not in suggestions[i]]
+        needed = num_suggestions - len(suggestions[i])
+        suggestions[i].extend(extras[:needed])
+
+    return suggestions
+
+def match_case(word, suggestion):
+    return suggestion[:1].upper() + suggestion[1:] if word[:1].isupper() else suggestion
+
+def spell_texts(texts, num_suggestions=5, tier=FULL):
+    """
+    /spell pipeline: every token of every text is checked against the dictionary in
+    one pass; only the unknown ones (once per distinct word) get suggestions.
+    Returns, per text, the unknown tokens with their character offsets.
+    """
+    with timed("tokenize"):
+        unknown = [unknown_tokens(text) for text in texts]
+    words = list(dict.fromkeys(word.lower() for tokens in unknown for _, _, word in tokens))
+    suggestions = dict(zip(words, suggest_words(words, num_suggestions, use_model=tier != EMERGENCY)))
+    return [
+        [
+            {
+                "start":       start,
+                "end":         end,
+                "word":        word,
+                "suggestions": [match_case(word, s) for s in suggestions[word.lower()]],
+            }
+            for start, end, word in tokens
+        ]
+        for tokens in unknown
+    ]
+
+# /spell returns at most this many suggestions per unknown word ("num_suggestions" in the payload)
+SPELL_MAX_SUGGESTIONS = 10
+
+@app.route('/spell', methods=['POST'])
+@requires_components
+@admitted
+def spell_check():
+    """
+    Spell-check a whole text without rewriting it.
+    Payload: {"text": ..., "num_suggestions": 5}
+    Response: {"errors": [{"start", "end", "word", "suggestions"}], "tier": ...}
+    """
+    data = request.get_json(force=True)
+    if not data or not isinstance(data.get("text"), str):
+        return jsonify({"error": "Invalid request, 'text' key missing"}), 400
+
+    text = data["text"]
+    num_suggestions = data.get("num_suggestions", 5)
+    if not isinstance(num_suggestions, int) or not 1 <= num_suggestions <= SPELL_MAX_SUGGESTIONS:
+        return jsonify({"error": f"'num_suggestions' must be an integer between 1 and {SPELL_MAX_SUGGESTIONS}"}), 400
+
+    tier = select_tier()
+    errors = in_flight.do(
+        ("spell", text, num_suggestions, tier),
+        lambda: spell_texts([text], num_suggestions, tier)[0],
+    )
+
+    return add_cors_headers(jsonify({"errors": errors, "tier": tier}))
+
 @app.route('/word', methods=['POST'])
+@requires_components
+@admitted
 def correct_word():
     data = request.get_json(force=True)
     if not data or "word" not in data:
         return jsonify({"error": "Invalid request, 'word' key missing"}), 400
 
     word = data["word"]
-    suggestions = recommend_corrected_word(word, num_suggestions=5)
-
-    if len(suggestions) < 5:
-        model_suggestions = generate_corrections(model, tokenizer, word, num_suggestions=9)
-        extras = [s for s in model_suggestions if s not in suggestions]
-        needed = 5 - len(suggestions)
-        suggestions.extend(extras[:needed])
+    suggestions = list(in_flight.do(("word", normalize_text(word)), lambda: suggest_words([word])[0]))
 
     return add_cors_headers(jsonify({
         "original":    word,
@@ -160,19 +778,167 @@ def correct_word():
     }))
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(REGISTRY.render(), mimetype=None, content_type=CONTENT_TYPE)
+
+
+@app.route('/debug/traces', methods=['GET'])
+def recent_traces():
+    if not is_local_request():
+        return jsonify({"error": "Not found"}), 404
+    return add_cors_headers(jsonify({"traces": tracer.recent(request.args.get("limit", 20, type=int))}))
+
+
+@app.route('/debug/traces/<trace_id>', methods=['GET'])
+def trace_detail(trace_id):
+    trace = tracer.get(trace_id) if is_local_request() else None
+    if trace is None:
+        return jsonify({"error": "Unknown or expired trace"}), 404
+    return add_cors_headers(jsonify(trace))
+
+
+@app.route('/ready', methods=['GET'])
+def readiness():
+    """
+    200 once every component is loaded, 503 before; lists component states and
+    which endpoints can already answer.
+    """
+    status = components.status()
+    ready = all(state["state"] == "ready" for state in status.values())
+    response = add_cors_headers(jsonify({
+        "ready":      ready,
+        "components": status,
+        "endpoints": {
+            endpoint: all(status[name]["state"] == "ready" for name in names)
+            for endpoint, names in ENDPOINT_COMPONENTS.items()
+        },
+    }))
+    response.status_code = 200 if ready else 503
+    return response
+
+
+@app.route('/stats', methods=['GET'])
+def serving_stats():
+    return add_cors_headers(jsonify({
+        "generation_cache": generation_cache.stats(),
+        "classifier_cache": classifier_cache.stats(),
+        "word_cache":       word_cache.stats(),
+        "coalescing":       in_flight.stats(),
+        "admission":        admission.stats(),
+        "tiers":            tier_policy.stats(),
+        "generation_queue": generation_pending(),
+        "word_generation_queue": generation_pending("word_generation"),
+    }))
+
+
+# /synonym may also walk the taxonomy this many levels up/down ("depth" in the payload)
+SYNONYM_MAX_DEPTH = 3
+
 @app.route('/synonym', methods=['POST'])
+@requires_components
 def recommend_wordnet():
+    """
+    Payload: {"word": ...} or, for many words in one call, {"words": [...]}; optional "depth".
+    All words (and all their reinflection candidates) are analysed in one batch.
+    """
     data = request.get_json()
-    if data is None or "word" not in data:
-        return jsonify({"error": "Invalid request, 'word' key missing"}), 400
+    if data is None or ("word" not in data and not isinstance(data.get("words"), list)):
+        return jsonify({"error": "Invalid request, 'word' key or 'words' list missing"}), 400
+
+    words = [data["word"]] if "word" in data else data["words"]
+    if not all(isinstance(w, str) and w.strip() for w in words):
+        return jsonify({"error": "Every word must be a non-empty string"}), 400
+
+    depth = data.get("depth", 1)
+    if isinstance(depth, bool) or not isinstance(depth, int) or not 1 <= depth <= SYNONYM_MAX_DEPTH:
+        return jsonify({"error": f"'depth' must be an integer between 1 and {SYNONYM_MAX_DEPTH}"}), 400
+
+    if "word" in data:
+        with timed("wordnet"):
+            suggestions = get_related_forms_many(words, depth)[0]
+        return add_cors_headers(jsonify({
+            "suggestions": suggestions
+        }))
+
+    with timed("wordnet"):
+        suggestions = get_related_forms_many(words, depth)
+    return add_cors_headers(jsonify({
+        "results": [{"word": w, "suggestions": s} for w, s in zip(words, suggestions)]
+    }))
 
-    word = data["word"]
-    suggestions = get_related_forms(word)
+BATCH_OPERATIONS = {
+    "check":   "text",
+    "correct": "text",
+    "word":    "word",
+    "synonym": "word",
+    "spell":   "text",
+}
+
+@app.route('/batch', methods=['POST'])
+@admitted
+def batch():
+    """
+    Run many heterogeneous operations in one round trip.
+    Payload: {"operations": [{"op": "check" | "correct" | "spell", "text": ...} | {"op": "word" | "synonym", "word": ...}]}
+    Every kind of operation goes through its engine once, in batched form, and the
+    results come back in the order of the operations.
+    """
+    data = request.get_json(force=True)
+    if not data or not isinstance(data.get("operations"), list):
+        return jsonify({"error": "Invalid request, 'operations' list missing"}), 400
+
+    operations = data["operations"]
+    by_kind = {op: [] for op in BATCH_OPERATIONS}
+    for idx, operation in enumerate(operations):
+        kind = operation.get("op") if isinstance(operation, dict) else None
+        if kind not in BATCH_OPERATIONS:
+            return jsonify({"error": f"Operation {idx}: unknown op {kind!r}"}), 400
+        field = BATCH_OPERATIONS[kind]
+        if not isinstance(operation.get(field), str):
+            return jsonify({"error": f"Operation {idx}: '{field}' must be a string"}), 400
+        by_kind[kind].append((idx, operation[field]))
+
+    # only the engines of the operations actually present have to be loaded
+    components.require(*sorted({
+        name for kind, items in by_kind.items() if items for name in ENDPOINT_COMPONENTS["/" + kind]
+    }))
 
-    response = jsonify({
-        "suggestions": suggestions
-    })
-    return add_cors_headers(response)
+    results = [None] * len(operations)
+    tier = select_tier()
+
+    # check: every sentence of every paragraph shares the classifier and generation batches
+    if by_kind["check"]:
+        paragraphs = [text for _, text in by_kind["check"]]
+        spans = [split_sentences(text) for text in paragraphs]
+        sentences = [text[start:end] for text, sp in zip(paragraphs, spans) for start, end in sp]
+        _, corrections = check_sentences(sentences, tier)
+        offset = 0
+        for (idx, text), sp in zip(by_kind["check"], spans):
+            corrected = join_sentences(text, sp, corrections[offset:offset + len(sp)])
+            results[idx] = {"corrected": corrected}
+            offset += len(sp)
+
+    if by_kind["correct"]:
+        for (idx, _), result in zip(by_kind["correct"], correct_texts([text for _, text in by_kind["correct"]], tier)):
+            results[idx] = result
+
+    if by_kind["word"]:
+        words = [word for _, word in by_kind["word"]]
+        for (idx, word), suggestions in zip(by_kind["word"], suggest_words(words, use_model=tier != EMERGENCY)):
+            results[idx] = {"original": word, "suggestions": suggestions}
+
+    if by_kind["spell"]:
+        for (idx, _), errors in zip(by_kind["spell"], spell_texts([text for _, text in by_kind["spell"]], tier=tier)):
+            results[idx] = {"errors": errors}
+
+    if by_kind["synonym"]:
+        with timed("wordnet"):
+            synonyms = get_related_forms_many([word for _, word in by_kind["synonym"]])
+        for (idx, _), suggestions in zip(by_kind["synonym"], synonyms):
+            results[idx] = {"suggestions": suggestions}
+
+    return add_cors_headers(jsonify({"results": results, "tier": tier}))
 
 if __name__ == '__main__':
     app.run(debug=True, use_reloader=False, host="localhost", port=5001, ssl_context=('./SSL/cert.pem', './SSL/key.pem'))
\ No newline at end of file
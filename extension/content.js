@@ -90,7 +90,8 @@ function addCorrectionButton(inputField) {
     // Handle correction
     button.onclick = async function (event) {
         event.stopPropagation();
-        let correctedText = await window.fetchCheckedAndCorrectedText(getFieldValue(inputField));
+        let documentId = `${location.origin}${location.pathname}#${inputField.id || inputField.name || "field"}`;
+        let correctedText = await window.fetchCheckedAndCorrectedText(getFieldValue(inputField), documentId);
         console.log("Corrected:", correctedText.corrected); // Let this be
         setFieldValue(correctedText.corrected);
     };
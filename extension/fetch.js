@@ -19,13 +19,18 @@ window.fetchCorrectedText = async (text) => {
     }
 }
 
-window.fetchCheckedAndCorrectedText = async (text) => {
+window.fetchCheckedAndCorrectedText = async (text, documentId = null) => {
     try {
+        let payload = { text: text };
+        // With a document id the server only re-checks the sentences changed since the last call
+        if (documentId) {
+            payload.document_id = documentId;
+        }
         let response = await fetch("https://localhost:5001/check", {
             method: "POST",
             mode: "cors",
             headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ text: text })
+            body: JSON.stringify(payload)
         });
 
         if (!response.ok) {
@@ -97,4 +102,4 @@ window.fetchCorrectedWord = async (word) => {
         console.error("Fetch Error:", error);
         return word;
     }
-}
\ No newline at end of file
+}
@@ -0,0 +1,122 @@
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _remove(path: Path):
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+@contextmanager
+def replaced_atomically(path: Path) -> Iterator[Path]:
+    """
+    Yield a temporary path next to `path` to write a file or directory into; it
+    is renamed onto `path` when the block succeeds and removed when it fails,
+    so readers (other workers included) never see a partial artifact.
+    """
+    path = Path(path)
+    tmp_path = Path(f"{path}.{os.getpid()}.tmp")
+    _remove(tmp_path)
+    try:
+        yield tmp_path
+        if tmp_path.is_dir() and path.exists():
+            _remove(path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        _remove(tmp_path)
+        raise
+
+
+def source_meta(format_version: int, source_path: Path) -> List[Tuple[str, str]]:
+    # Rows of the meta table CompiledSQLite checks: format and sha256 of the compiled source
+    return [("format", str(format_version)), ("source_sha256", file_sha256(source_path))]
+
+
+class CompiledSQLite:
+    """
+    A read-only SQLite file compiled from a source file (rown.xml, ro.dix).
+
+    `load` compiles it with `compile_fn(source_path, path)` when it is missing or
+    its meta table (see source_meta) records another format or source; without
+    the source (index-only deployments) there is nothing to compare against.
+    The file is immutable once loaded, so each thread gets its own read-only
+    connection and the OS page cache is shared by all of them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        format_version: int,
+        compile_fn: Callable[[Path, Path], Path],
+        source_path: Path,
+        path: Path,
+        mmap_size: int = 0,
+    ):
+        self.name = name
+        self.format_version = format_version
+        self.compile_fn = compile_fn
+        self.source_path = Path(source_path)
+        self.path = Path(path)
+        self.mmap_size = mmap_size
+
+        self._loaded_path: Optional[Path] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def is_current(self, path: Path, source_path: Path) -> bool:
+        try:
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                meta = dict(conn.execute("SELECT key, value FROM meta"))
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return False
+        if meta.get("format") != str(self.format_version):
+            return False
+        return not source_path.exists() or meta.get("source_sha256") == file_sha256(source_path)
+
+    def load(self, source_path: Optional[Path] = None, path: Optional[Path] = None):
+        """
+        Make the compiled file available, compiling the source first if the file
+        is missing or stale; later calls are no-ops.
+        """
+        if self._loaded_path is not None:
+            return
+        with self._lock:
+            if self._loaded_path is None:
+                source_path = Path(source_path or self.source_path)
+                path = Path(path or self.path)
+                if not self.is_current(path, source_path):
+                    logger.warning("%s %s is missing or stale, compiling %s", self.name, path, source_path)
+                    self.compile_fn(source_path, path)
+                self._loaded_path = path
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.load()
+            conn = sqlite3.connect(f"file:{self._loaded_path}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+            if self.mmap_size:
+                conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+            self._local.conn = conn
+        return conn
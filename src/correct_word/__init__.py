@@ -1,5 +1,5 @@
 # src/correct_word/__init__.py
 
-from .levenshtein import recommend_corrected_word
+from .levenshtein import recommend_corrected_word, recommend_corrected_words
 
-__all__ = ["recommend_corrected_word"]
+__all__ = ["recommend_corrected_word", "recommend_corrected_words"]
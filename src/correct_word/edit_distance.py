@@ -0,0 +1,157 @@
+import functools
+import math
+import unicodedata
+from typing import Sequence
+
+import numpy as np
+
+# Substituting a letter by the same letter with another diacritic (a/ă/â, s/ș, ...)
+# costs this much instead of a full edit.
+DIACRITIC_COST = 0.25
+
+# Base letters of everything up to the end of Latin Extended-B (Romanian ș/ț included)
+# are tabulated at import; rarer characters go through the cached slow path.
+_TABLE_SIZE = 0x250
+_NO_BASE = -1
+_PAD = -1
+
+
+def _compute_base(code: int) -> int:
+    # Code of the single base letter of the character, or _NO_BASE if it has none
+    norm = unicodedata.normalize("NFD", chr(code))
+    base = "".join(ch for ch in norm if unicodedata.category(ch) != "Mn")
+    return ord(base) if len(base) == 1 else _NO_BASE
+
+
+_BASE_TABLE = [_compute_base(code) for code in range(_TABLE_SIZE)]
+
+
+@functools.lru_cache(maxsize=4096)
+def _base_slow(code: int) -> int:
+    return _compute_base(code)
+
+
+def base_code(code: int) -> int:
+    return _BASE_TABLE[code] if code < _TABLE_SIZE else _base_slow(code)
+
+
+# str.translate table taking every tabulated letter with a diacritic to its base letter
+_FOLD_TABLE = {code: base for code, base in enumerate(_BASE_TABLE) if base not in (_NO_BASE, code)}
+_TABLE_END = chr(_TABLE_SIZE)
+
+
+def _fold_char(ch: str) -> str:
+    base = base_code(ord(ch))
+    return ch if base == _NO_BASE else chr(base)
+
+
+def fold_diacritics(word: str) -> str:
+    # Same notion of "diacritic" as levenshtein: rarer letters go through base_code too
+    if max(word, default="") < _TABLE_END:
+        return word.translate(_FOLD_TABLE)
+    return "".join(_fold_char(ch) for ch in word)
+
+
+def is_base_letter_and_diacritic_form(char1: str, char2: str) -> bool:
+    """
+    Return True if char1 and char2 share the same base letter but differ
+    by a diacritic (precomposed or combining form).
+    """
+    if char1 == char2 or len(char1) != 1 or len(char2) != 1:
+        return False
+    b1 = base_code(ord(char1))
+    return b1 != _NO_BASE and b1 == base_code(ord(char2))
+
+
+def _encode(word: str):
+    codes = [ord(ch) for ch in word]
+    return codes, [base_code(code) for code in codes]
+
+
+def levenshtein(w1: str, w2: str, max_distance: float = math.inf) -> float:
+    """
+    Edit distance where insertions, deletions and substitutions cost 1 and a
+    diacritic-only substitution costs DIACRITIC_COST. Returns math.inf as soon
+    as the distance is known to exceed `max_distance`.
+    """
+    if w1 == w2:
+        return 0.0
+    if abs(len(w1) - len(w2)) > max_distance:
+        return math.inf
+    codes1, bases1 = _encode(w1)
+    codes2, bases2 = _encode(w2)
+    n = len(codes2)
+    prev = [float(j) for j in range(n + 1)]
+
+    for i in range(len(codes1)):
+        c1, b1 = codes1[i], bases1[i]
+        curr = [i + 1.0]
+        left = i + 1.0
+        for j in range(n):
+            c2 = codes2[j]
+            if c1 == c2:
+                sub = prev[j]
+            elif b1 != _NO_BASE and b1 == bases2[j]:
+                sub = prev[j] + DIACRITIC_COST
+            else:
+                sub = prev[j] + 1.0
+            left = min(prev[j + 1] + 1.0, left + 1.0, sub)
+            curr.append(left)
+        # every later row is at least the minimum of this one
+        if min(curr) > max_distance:
+            return math.inf
+        prev = curr
+
+    return prev[n] if prev[n] <= max_distance else math.inf
+
+
+def _encode_many(words: Sequence[str]):
+    width = max((len(w) for w in words), default=0)
+    codes = np.full((len(words), width), _PAD, dtype=np.int32)
+    for k, word in enumerate(words):
+        codes[k, :len(word)] = [ord(ch) for ch in word]
+    bases = np.full_like(codes, _NO_BASE)
+    for code in np.unique(codes[codes != _PAD]).tolist():
+        bases[codes == code] = base_code(code)
+    lengths = np.fromiter((len(w) for w in words), dtype=np.intp, count=len(words))
+    return codes, bases, lengths
+
+
+def levenshtein_many(word: str, candidates: Sequence[str], max_distance: float = math.inf) -> np.ndarray:
+    """
+    levenshtein(word, c) for every candidate at once, as a float array.
+
+    The DP runs one query character at a time over all candidates and all their
+    positions: deletions and substitutions are elementwise, and the insertion
+    chain of a row is a running minimum of (cell - j) + j. Candidates shorter
+    than the widest one are padded; padding never feeds back into the cells
+    before it, so each result is read at the candidate's own length.
+    """
+    if not candidates:
+        return np.empty(0, dtype=np.float64)
+    codes, bases, lengths = _encode_many(candidates)
+    query, query_bases = _encode(word)
+    k, width = codes.shape
+    offsets = np.arange(width + 1, dtype=np.float64)
+    prev = np.broadcast_to(offsets, (k, width + 1)).copy()
+    in_word = offsets[None, :] <= lengths[:, None]
+    alive = np.ones(k, dtype=bool)
+
+    for i, (code, base) in enumerate(zip(query, query_bases)):
+        sub_cost = np.where(codes == code, 0.0, 1.0)
+        if base != _NO_BASE:
+            sub_cost[(bases == base) & (codes != code)] = DIACRITIC_COST
+        curr = np.empty_like(prev)
+        curr[:, 0] = i + 1
+        np.minimum(prev[:, 1:] + 1.0, prev[:, :-1] + sub_cost, out=curr[:, 1:])
+        curr = np.minimum.accumulate(curr - offsets, axis=1) + offsets
+        # a candidate whose whole row (up to its length) is past the cutoff cannot recover
+        alive &= np.where(in_word, curr, np.inf).min(axis=1) <= max_distance
+        if not alive.any():
+            return np.full(k, np.inf)
+        prev = curr
+
+    distances = prev[np.arange(k), lengths]
+    distances[~alive | (distances > max_distance)] = np.inf
+    return distances
+
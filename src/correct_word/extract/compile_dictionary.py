@@ -0,0 +1,35 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+from src.correct_word.levenshtein import ARTIFACT_PATH, VOCAB_PATH, compile_dictionary
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute the SymSpell dictionary of corpus.txt into a versioned artifact."
+    )
+    parser.add_argument(
+        "corpus",
+        help="Path to corpus.txt (default: the one next to this script)",
+        nargs="?",
+        default=VOCAB_PATH
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Output artifact (default: corpus.symspell next to the corpus)",
+        default=None
+    )
+    args = parser.parse_args()
+
+    corpus = Path(args.corpus)
+    output = Path(args.output) if args.output else (ARTIFACT_PATH if corpus == VOCAB_PATH else corpus.with_suffix(".symspell"))
+
+    started = time.perf_counter()
+    compile_dictionary(corpus, output)
+    print(f"Compiled {corpus!s} into {output!s} in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
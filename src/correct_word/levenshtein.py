@@ -1,62 +1,210 @@
+from collections import Counter
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from symspellpy import SymSpell, Verbosity
-import unicodedata
+import gc
+import heapq
+import json
+import logging
+import pickle
+import re
+import threading
+
+from src.artifacts import file_sha256, replaced_atomically
+from src.correct_word.edit_distance import fold_diacritics, levenshtein_many
+
+logger = logging.getLogger(__name__)
 
 # !! Be aware to not call this dict for distance > 2, error will be thrown
 sym = SymSpell(max_dictionary_edit_distance=2, prefix_length=7)
 
 VOCAB_PATH = Path(__file__).resolve().parents[2] / "src" / "correct_word" / "extract" / "corpus.txt"
-sym.create_dictionary(
-    VOCAB_PATH,
-    encoding="utf-8",
-    errors="ignore"
-)
+# Prepared dictionary (all deletion variants) produced by extract/compile_dictionary.py
+ARTIFACT_PATH = VOCAB_PATH.with_suffix(".symspell")
+ARTIFACT_FORMAT = 3
+
+_dictionary_loaded = False
+# Diacritic-stripped key -> every attested form with that key (only keys that have a form
+# with diacritics); shipped in the artifact next to the SymSpell pickle.
+_diacritic_index: Dict[str, Tuple[str, ...]] = {}
+_dictionary_lock = threading.Lock()
+
+def _artifact_header(vocab_path: Optional[Path]) -> dict:
+    header = {
+        "format": ARTIFACT_FORMAT,
+        "symspell_data_version": sym.data_version,
+        "max_dictionary_edit_distance": sym._max_dictionary_edit_distance,
+        "prefix_length": sym._prefix_length,
+    }
+    if vocab_path is not None:
+        header["corpus_sha256"] = file_sha256(vocab_path)
+    return header
 
-def is_base_letter_and_diacritic_form(char1: str, char2: str) -> bool:
+def build_diacritic_index(words) -> Dict[str, Tuple[str, ...]]:
     """
-    Return True if char1 and char2 share the same base letter but differ
-    by a diacritic (precomposed or combining form).
+    Group the words by their diacritic-stripped form, keeping only the groups in
+    which some word carries diacritics (all others restore to themselves).
     """
-    def split_base_and_marks(c: str):
-        norm = unicodedata.normalize('NFD', c)
-        base = ''.join(ch for ch in norm if unicodedata.category(ch) != 'Mn')
-        marks = [ch for ch in norm if unicodedata.category(ch).startswith('M')]
-        return base, marks
+    groups: Dict[str, List[str]] = {}
+    for word in words:
+        groups.setdefault(fold_diacritics(word), []).append(word)
+    return {key: tuple(forms) for key, forms in groups.items() if len(forms) > 1 or forms[0] != key}
 
-    b1, _ = split_base_and_marks(char1)
-    b2, _ = split_base_and_marks(char2)
-    return len(b1) == len(b2) == 1 and b1 == b2 and char1 != char2
+def _write_artifact(prepared: SymSpell, index: Dict[str, Tuple[str, ...]], vocab_path: Path, artifact_path: Path):
+    header = _artifact_header(vocab_path)
+    header["words"] = len(prepared.words)
+    payload = prepared.save_pickle(to_bytes=True)
+    header["symspell_bytes"] = len(payload)
+    with replaced_atomically(artifact_path) as tmp_path, open(tmp_path, "wb") as f:
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        f.write(payload)
+        f.write(pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL))
 
+def compile_dictionary(vocab_path: Path = VOCAB_PATH, artifact_path: Path = ARTIFACT_PATH) -> Path:
+    """
+    Build the dictionary from the corpus and write it as a versioned artifact:
+    one JSON header line (format, SymSpell settings, corpus sha256) followed by
+    the uncompressed SymSpell pickle and the pickled diacritic index.
+    """
+    prepared = SymSpell(
+        max_dictionary_edit_distance=sym._max_dictionary_edit_distance,
+        prefix_length=sym._prefix_length,
+    )
+    if not prepared.create_dictionary(vocab_path, encoding="utf-8", errors="ignore"):
+        raise FileNotFoundError(f"Corpus not found at {vocab_path}")
+    _write_artifact(prepared, build_diacritic_index(prepared.words), vocab_path, artifact_path)
+    return Path(artifact_path)
 
-def levenshtein(w1: str, w2: str) -> float:
+def _load_artifact(vocab_path: Path, artifact_path: Path) -> bool:
     """
-    Return True if char1 and char2 share the same base letter but differ
-    by a diacritic (precomposed or combining form).
+    Load the prepared dictionary into `sym` if the artifact matches the current
+    format, SymSpell settings and corpus (when the corpus is present to compare).
     """
-    m, n = len(w1), len(w2)
-    prev = list(range(n + 1))
-    curr = [0.0] * (n + 1)
+    if not Path(artifact_path).exists():
+        return False
+    with open(artifact_path, "rb") as f:
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            logger.warning("Ignoring unreadable dictionary artifact %s", artifact_path)
+            return False
+        # without the corpus (artifact-only deployments) there is nothing to compare the hash with
+        expected = _artifact_header(vocab_path if Path(vocab_path).exists() else None)
+        for key, value in expected.items():
+            if header.get(key) != value:
+                logger.warning("Dictionary artifact %s is stale (%s differs), rebuilding", artifact_path, key)
+                return False
+        payload = f.read(header["symspell_bytes"])
+        index_payload = f.read()
+    # unpickling millions of small containers is mostly spent in cyclic GC passes
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        loaded = sym.load_pickle(payload, from_bytes=True)
+        _diacritic_index.update(pickle.loads(index_payload))
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return loaded
 
-    for i in range(m):
-        curr[0] = i + 1
-        for j in range(n):
-            if w1[i] == w2[j]:
-                sub_cost = 0.0
-            elif is_base_letter_and_diacritic_form(w1[i], w2[j]):
-                sub_cost = 0.25
-            else:
-                sub_cost = 1.0
+def load_dictionary(vocab_path: Path = VOCAB_PATH, artifact_path: Optional[Path] = ARTIFACT_PATH) -> SymSpell:
+    """
+    Load the SymSpell dictionary on first use; later calls return it as is.
+    The compiled artifact is used when it is up to date; otherwise the dictionary
+    is rebuilt from the corpus and the artifact refreshed for the next start.
+    """
+    global _dictionary_loaded
+    if not _dictionary_loaded:
+        with _dictionary_lock:
+            if not _dictionary_loaded:
+                if artifact_path is None or not _load_artifact(vocab_path, artifact_path):
+                    sym.create_dictionary(
+                        vocab_path,
+                        encoding="utf-8",
+                        errors="ignore"
+                    )
+                    _diacritic_index.update(build_diacritic_index(sym.words))
+                    if artifact_path is not None and sym.words:
+                        try:
+                            _write_artifact(sym, _diacritic_index, vocab_path, artifact_path)
+                        except OSError as exc:
+                            logger.warning("Could not write dictionary artifact %s: %s", artifact_path, exc)
+                _dictionary_loaded = True
+    return sym
 
-            cost_sub = prev[j] + sub_cost
-            curr[j+1] = min(
-                prev[j+1] + 1,     # deletion
-                curr[j]   + 1,     # insertion
-                cost_sub           # substitution (0/0.25/1)
-            )
-        prev, curr = curr, [0.0] * (n + 1)
+def diacritic_variants(word: str) -> List[str]:
+    """
+    Attested forms that differ from `word` only in diacritics (including `word`
+    itself when it is attested), by one dictionary lookup.
+    """
+    load_dictionary()
+    key = fold_diacritics(word)
+    if key in _diacritic_index:
+        return list(_diacritic_index[key])
+    # the index leaves out words without diacritic forms: they only restore to themselves
+    return [key] if key in sym.words else []
 
-    return float(prev[n])
+def _rank_near(word: str, num_suggestions: int, max_plain_dist: int, max_diacritic_dist: float) -> Optional[List[str]]:
+    # Only diacritic substitutions cost less than 1, so every candidate within a weighted
+    # distance of 1 either shares the word's stripped key (diacritic_variants) or is one plain
+    # edit away, which a distance-1 lookup finds for a fraction of the distance-2 search. That
+    # lookup lists its suggestions in the same order as the full one, and the variants it misses
+    # come after them, by SymSpell distance and frequency. Only when two of those tie and one
+    # reaches the top does the order depend on the full search: None means "search as usual".
+    if max_diacritic_dist > 1.0 or max_plain_dist < 1:
+        return None
+    rank = {cand.term: (0, i) for i, cand in enumerate(sym.lookup(word, Verbosity.ALL, max_edit_distance=1))}
+    for form in diacritic_variants(word):
+        if form not in rank:
+            distance = sym.distance_comparer.compare(word, form, max_plain_dist)
+            if distance >= 0:
+                rank[form] = (1, distance, -sym.words[form])
+    terms = [t for t in rank if abs(len(t) - len(word)) <= max_diacritic_dist]
+    scored = [
+        (dist, rank[term], term)
+        for dist, term in zip(levenshtein_many(word, terms, max_diacritic_dist).tolist(), terms)
+        if dist <= max_diacritic_dist
+    ]
+    best = heapq.nsmallest(num_suggestions, scored)
+    ties = Counter((dist, key) for dist, key, _ in scored)
+    if any(key[0] == 1 and ties[dist, key] > 1 for dist, key, _ in best):
+        return None
+    return [term for _, _, term in best]
+
+def _rank_candidates(word: str, terms: List[str], num_suggestions: int, max_diacritic_dist: float) -> List[str]:
+    # Every candidate is scored exactly once; only the best `num_suggestions` are kept, with
+    # ties in SymSpell's order (closest plain distance, then most frequent).
+    terms = [t for t in terms if abs(len(t) - len(word)) <= max_diacritic_dist]
+    distances = levenshtein_many(word, terms, max_diacritic_dist).tolist()
+    best = heapq.nsmallest(num_suggestions, zip(distances, range(len(terms)), terms))
+    return [term for dist, _, term in best if dist <= max_diacritic_dist]
+
+def recommend_corrected_words(
+    words: List[str],
+    num_suggestions: int = 5,
+    max_plain_dist: int = 2,
+    max_diacritic_dist: float = 1.0
+) -> List[List[str]]:
+    """
+    Suggestions for several words in one call; repeated words are looked up once.
+    Every candidate that can rank is a diacritic variant or one plain edit away, so
+    words are answered from the diacritic index and a distance-1 lookup, with the
+    same results and order as the full search (see _rank_near).
+    Verbosity.ALL is kept on purpose: a word two diacritics away (plain distance 2,
+    weighted 0.5) must still outrank a plain distance 1 substitution.
+    """
+    if not words:
+        return []
+    sym = load_dictionary()
+    results = {}
+    for word in dict.fromkeys(words):
+        shortcut = _rank_near(word, num_suggestions, max_plain_dist, max_diacritic_dist)
+        if shortcut is not None:
+            results[word] = shortcut
+            continue
+        raw = sym.lookup(word, Verbosity.ALL, max_edit_distance=max_plain_dist)
+        results[word] = _rank_candidates(word, [cand.term for cand in raw], num_suggestions, max_diacritic_dist)
+    return [list(results[word]) for word in words]
 
 def recommend_corrected_word(
     word: str,
@@ -64,8 +212,41 @@ def recommend_corrected_word(
     max_plain_dist: int = 2,
     max_diacritic_dist: float = 1.0
 ) -> List[str]:
-    raw = sym.lookup(word, Verbosity.ALL, max_edit_distance=max_plain_dist)
-    scored = [(cand.term, levenshtein(word, cand.term)) for cand in raw]
-    filtered = [w for w,d in scored if d <= max_diacritic_dist]
-    filtered.sort(key=lambda w: levenshtein(word, w))
-    return filtered[:num_suggestions]
\ No newline at end of file
+    return recommend_corrected_words([word], num_suggestions, max_plain_dist, max_diacritic_dist)[0]
+
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+
+def unknown_tokens(text: str) -> List[Tuple[int, int, str]]:
+    """
+    (start, end, word) of every word of the text missing from the dictionary,
+    found in one pass over the tokens; known words cost a set lookup each.
+    """
+    words = load_dictionary().words
+    return [
+        (match.start(), match.end(), match.group(0))
+        for match in WORD_PATTERN.finditer(text)
+        if match.group(0) not in words and match.group(0).lower() not in words
+    ]
+
+
+def correct_text_tokens(text: str) -> str:
+    """
+    Cheap token-level correction without any neural model: every word missing
+    from the dictionary is replaced by its best SymSpell/Levenshtein suggestion.
+    """
+    unknown = list(dict.fromkeys(word for _, _, word in unknown_tokens(text)))
+    best = {
+        word: suggestions[0]
+        for word, suggestions in zip(unknown, recommend_corrected_words([w.lower() for w in unknown], num_suggestions=1))
+        if suggestions
+    }
+
+    def fix(match):
+        word = match.group(0)
+        if word not in best:
+            return word
+        return best[word][:1].upper() + best[word][1:] if word[:1].isupper() else best[word]
+
+    return WORD_PATTERN.sub(fix, text)
@@ -73,6 +73,20 @@ def clean_text(text: str) -> str:
     return re.sub(r"\s+", " ", text.strip())
 
 
+SENTENCE_BOUNDARY = re.compile(r"(?<=[\.\!\?])\s+")
+
+
+def split_sentences(text: str):
+    """Split on sentence-final punctuation, returning the (start, end) span of every sentence."""
+    spans = []
+    start = 0
+    for m in SENTENCE_BOUNDARY.finditer(text):
+        spans.append((start, m.start()))
+        start = m.end()
+    spans.append((start, len(text)))
+    return spans
+
+
 @torch.inference_mode()
 def predict_on_text(
     text: str,
@@ -94,6 +108,36 @@ def predict_on_text(
     label_map = {0: "Correct", 1: "Incorrect"}
     return label_map[pred_idx], pred_idx
 
+@torch.inference_mode()
+def classify_sentences(
+    sentences,
+    model: PreTrainedModel,
+    tokenizer: AutoTokenizer,
+    max_length: int = None,
+    batch_size: int = 32,
+):
+    """
+    Classify many sentences with as few forward passes as possible.
+
+    Sentences are sorted by token length and split into buckets of `batch_size`,
+    each padded only to its own longest member. Returns the predicted class index
+    (0 = Correct, 1 = Incorrect) for every sentence, in input order.
+    """
+    if not sentences:
+        return []
+    encoded = tokenizer(list(sentences), truncation=True, max_length=max_length)
+    order = sorted(range(len(sentences)), key=lambda i: len(encoded["input_ids"][i]))
+
+    predictions = [0] * len(sentences)
+    for b in range(0, len(order), batch_size):
+        bucket = order[b:b + batch_size]
+        features = [{k: encoded[k][i] for k in encoded.keys()} for i in bucket]
+        batch = tokenizer.pad(features, padding=True, return_tensors="pt").to(model.device)
+        logits = model(**batch)["logits"]
+        for i, pred_idx in zip(bucket, torch.argmax(logits, dim=1).tolist()):
+            predictions[i] = pred_idx
+    return predictions
+
 # 4.  Main
 def main():
     # Build a **relative** path so HF never mistakes it for a Hub repo
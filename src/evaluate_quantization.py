@@ -0,0 +1,93 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from sacrebleu import corpus_bleu
+from transformers import AutoTokenizer
+
+from src.models import generate_corrections_batch, load_model
+from src.quantize_model import CLASSIFIER_PATH, ROOT, load_float
+from src.quantization import load_quantized
+
+DEV_PATH = ROOT / "GEC" / "dev.txt"
+
+def read_pairs(path: Path, limit: int):
+    # dev.txt alternates a correct sentence and its erroneous version (see RoNACCDatasetPaired)
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip()]
+    pairs = [(lines[i], lines[i + 1]) for i in range(0, len(lines) - 1, 2)]
+    return pairs[:limit] if limit else pairs
+
+def evaluate_t5(model, tokenizer, pairs, batch_size: int, speculative: bool = False):
+    # greedy decoding as /check serves it: `speculative` mirrors GENERATION_SPECULATIVE in app.py
+    correct, wrong = zip(*pairs)
+    started = time.perf_counter()
+    predictions = []
+    for b in range(0, len(wrong), batch_size):
+        batch = generate_corrections_batch(
+            model, tokenizer, list(wrong[b:b + batch_size]), num_suggestions=1, speculative=speculative
+        )
+        predictions.extend(s[0] if s else "" for s in batch)
+    seconds = time.perf_counter() - started
+    return {
+        "bleu": corpus_bleu(predictions, [list(correct)]).score,
+        "exact_match": sum(p == c for p, c in zip(predictions, correct)) / len(pairs),
+        "seconds": seconds,
+    }
+
+def evaluate_classifier(model, tokenizer, pairs, batch_size: int):
+    from sklearn.metrics import f1_score
+    from src.detection.detect import classify_sentences
+    sentences = [s for pair in pairs for s in pair]
+    labels = [0, 1] * len(pairs)   # 0 = Correct, 1 = Incorrect
+    started = time.perf_counter()
+    predictions = classify_sentences(sentences, model, tokenizer, batch_size=batch_size)
+    seconds = time.perf_counter() - started
+    return {"f1": f1_score(labels, predictions), "seconds": seconds}
+
+def report(name, float_metrics, int8_metrics):
+    print(f"\n{name}")
+    print(f"  {'metric':<12}{'float':>10}{'int8':>10}")
+    for key in float_metrics:
+        print(f"  {key:<12}{float_metrics[key]:>10.3f}{int8_metrics[key]:>10.3f}")
+    print(f"  speedup     {float_metrics['seconds'] / int8_metrics['seconds']:>10.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare float and int8-quantized models on GEC/dev.txt (CPU)."
+    )
+    parser.add_argument("--dev", help="Paired dev file", default=DEV_PATH)
+    parser.add_argument("--t5", help="Seq2seq model directory", default=ROOT / "t5-grammar-finetuned")
+    parser.add_argument("--classifier", help="Classifier directory", default=CLASSIFIER_PATH)
+    parser.add_argument("--limit", help="Evaluate only the first N sentence pairs (0 = all)", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument(
+        "--speculative",
+        help="Decode the T5 corrector with input-copy speculative decoding, as app.py does with "
+             "GENERATION_SPECULATIVE = True (int8 models always use plain greedy decoding)",
+        action="store_true",
+    )
+    parser.add_argument("--skip", choices=["t5", "classifier"], action="append", default=[])
+    args = parser.parse_args()
+
+    pairs = read_pairs(Path(args.dev), args.limit)
+    print(f"{len(pairs)} sentence pairs from {args.dev}")
+
+    if "t5" not in args.skip:
+        float_model, tokenizer = load_model(str(args.t5))
+        float_model.to("cpu")
+        int8_model, _ = load_model(str(args.t5), quantize=True)
+        report("T5 corrector", evaluate_t5(float_model, tokenizer, pairs, args.batch_size, args.speculative),
+               evaluate_t5(int8_model, tokenizer, pairs, args.batch_size, args.speculative))
+
+    if "classifier" not in args.skip:
+        tokenizer = AutoTokenizer.from_pretrained(str(args.classifier))
+        float_model = load_float(Path(args.classifier), classifier=True).eval()
+        int8_model = load_quantized(load_float(Path(args.classifier), classifier=True), str(args.classifier))
+        report("Classifier", evaluate_classifier(float_model, tokenizer, pairs, args.batch_size),
+               evaluate_classifier(int8_model, tokenizer, pairs, args.batch_size))
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,39 @@
 import torch
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, LogitsProcessorList
 
-def load_model(model_path: str):
+from src.onnx_backend import load_onnx
+from src.quantization import is_quantized, load_quantized
+from src.speculative import generate_copy_speculative
+
+# Inference backends load_model can serve a seq2seq model with
+BACKENDS = ("torch", "onnx")
+
+def load_model(model_path: str, quantize: bool = False, backend: str = "torch"):
 
     # Loads tokenizer + model.
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
     tokenizer = AutoTokenizer.from_pretrained(model_path)
+
+    # ONNX Runtime graphs exported from the same weights (see src/onnx_backend.py)
+    if backend == "onnx":
+        if quantize:
+            raise ValueError("int8 quantization is only available for the torch backend")
+        return load_onnx(model_path), tokenizer
+
     model = AutoModelForSeq2SeqLM.from_pretrained(model_path)
     model.eval()
 
+    # int8 dynamic quantization only runs on CPU (see src/quantization.py)
+    if quantize:
+        return load_quantized(model, model_path), tokenizer
+
     # if you have a GPU:
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     model.to(device)
     return model, tokenizer
 
-def generate_corrections(model, tokenizer, text: str, num_suggestions: int = 3):
-    
-    # Generate the top n suggestions for the given text.
-    device = next(model.parameters()).device
-    inputs = tokenizer.encode("grammar: " + text, return_tensors="pt").to(device)
-    outputs = model.generate(
-        inputs,
-        num_beams=num_suggestions,
-        num_return_sequences=num_suggestions,
-        max_length=inputs.shape[-1] + 50,
-        early_stopping=True,
-        no_repeat_ngram_size=3,
-    )
-    suggestions = [tokenizer.decode(o, skip_special_tokens=True) for o in outputs]
+def _unique(suggestions):
     seen = set()
     unique = []
     for s in suggestions:
@@ -34,3 +41,79 @@ def generate_corrections(model, tokenizer, text: str, num_suggestions: int = 3):
             seen.add(s)
             unique.append(s)
     return unique
+
+def generate_corrections(model, tokenizer, text: str, num_suggestions: int = 3):
+
+    # Generate the top n suggestions for the given text.
+    return generate_corrections_batch(model, tokenizer, [text], num_suggestions=num_suggestions)[0]
+
+def generate_corrections_batch(model, tokenizer, texts, num_suggestions: int = 3, logits_processor=None,
+                               speculative: bool = False):
+
+    # Generate the top n suggestions for every text with a single padded generate call.
+    # Extra logits processors (e.g. the tracing probe) are called once per decoding step.
+    # The output cap (padded input length + 50 tokens) is shared by the whole batch, so a
+    # text whose correction runs past its own length + 50 tokens may be cut at a different
+    # point depending on the texts batched with it; real corrections end long before that.
+    # With `speculative`, single-suggestion (greedy) requests on a float torch model use
+    # input-copy speculative decoding instead (see src/speculative.py). int8 models keep
+    # plain generate: their activation scales depend on the tensor shapes, so the two
+    # searches would not pick the same tokens.
+    if not texts:
+        return []
+    if speculative and num_suggestions == 1 and isinstance(model, torch.nn.Module) and not is_quantized(model):
+        return [[s] for s in generate_copy_speculative(model, tokenizer, texts, logits_processor)]
+    device = model.device
+    inputs = tokenizer(
+        ["grammar: " + t for t in texts],
+        return_tensors="pt",
+        padding=True,
+    ).to(device)
+    with torch.inference_mode():
+        outputs = model.generate(
+            **inputs,
+            num_beams=num_suggestions,
+            num_return_sequences=num_suggestions,
+            max_length=inputs["input_ids"].shape[-1] + 50,
+            early_stopping=True,
+            no_repeat_ngram_size=3,
+            logits_processor=LogitsProcessorList(logits_processor or []),
+        )
+    suggestions = tokenizer.batch_decode(outputs, skip_special_tokens=True)
+    # generate returns num_suggestions consecutive rows for every input
+    return [
+        _unique(suggestions[i * num_suggestions:(i + 1) * num_suggestions])
+        for i in range(len(texts))
+    ]
+
+# The word-level model (ro-word-correction) was trained on single words of at most this many tokens
+WORD_MAX_LENGTH = 16
+
+def generate_word_corrections_batch(model, tokenizer, words, num_suggestions: int = 3, logits_processor=None):
+
+    # Word-level counterpart of generate_corrections_batch: no task prefix (the word model was
+    # trained on bare words), inputs and outputs capped at WORD_MAX_LENGTH tokens.
+    if not words:
+        return []
+    device = model.device
+    inputs = tokenizer(
+        list(words),
+        return_tensors="pt",
+        padding=True,
+        truncation=True,
+        max_length=WORD_MAX_LENGTH,
+    ).to(device)
+    with torch.inference_mode():
+        outputs = model.generate(
+            **inputs,
+            num_beams=num_suggestions,
+            num_return_sequences=num_suggestions,
+            max_length=WORD_MAX_LENGTH,
+            early_stopping=True,
+            logits_processor=LogitsProcessorList(logits_processor or []),
+        )
+    suggestions = tokenizer.batch_decode(outputs, skip_special_tokens=True)
+    return [
+        _unique(s.strip() for s in suggestions[i * num_suggestions:(i + 1) * num_suggestions])
+        for i in range(len(words))
+    ]
@@ -0,0 +1,55 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+SPACY_MODEL = "ro_core_news_sm"
+
+# Components a word-level morphology lookup does not need
+MORPHOLOGY_DISABLED = ("parser", "ner")
+MORPHOLOGY_CACHE_SIZE = 50000
+
+_nlp = None
+_lock = threading.Lock()
+
+_morphology: "OrderedDict[str, Optional[Tuple[str, str, Dict[str, str]]]]" = OrderedDict()
+_morphology_lock = threading.Lock()
+
+def load_spacy():
+
+    # Shared spaCy pipeline, loaded on first use (and only once per process).
+    global _nlp
+    if _nlp is None:
+        with _lock:
+            if _nlp is None:
+                import spacy
+                _nlp = spacy.load(SPACY_MODEL)
+    return _nlp
+
+def word_morphology(words: List[str]) -> List[Optional[Tuple[str, str, Dict[str, str]]]]:
+
+    # (lemma, POS, morphological features) of the first token of every word, or None when
+    # spaCy has no morphology for it. Results live in a bounded LRU; the misses of a call
+    # go through a single nlp.pipe with the parser and NER disabled.
+    results = {}
+    with _morphology_lock:
+        for w in words:
+            if w in _morphology:
+                _morphology.move_to_end(w)
+                results[w] = _morphology[w]
+    missing = list(dict.fromkeys(w for w in words if w not in results))
+
+    if missing:
+        nlp = load_spacy()
+        disabled = [name for name in MORPHOLOGY_DISABLED if name in nlp.pipe_names]
+        for w, doc in zip(missing, nlp.pipe(missing, disable=disabled)):
+            if not doc or not doc[0].has_morph:
+                results[w] = None
+            else:
+                results[w] = (doc[0].lemma_, doc[0].pos_, doc[0].morph.to_dict())
+        with _morphology_lock:
+            for w in missing:
+                _morphology[w] = results[w]
+            while len(_morphology) > MORPHOLOGY_CACHE_SIZE:
+                _morphology.popitem(last=False)
+
+    return [results[w] for w in words]
@@ -0,0 +1,70 @@
+import json
+import logging
+import threading
+from pathlib import Path
+
+import torch
+
+from src.artifacts import replaced_atomically
+from src.quantization import weights_signature
+
+logger = logging.getLogger(__name__)
+
+# Exported graphs live in this subdirectory of the model directory
+ONNX_DIR = "onnx"
+ONNX_FORMAT = 1
+_EXPORT_META = "export.json"
+
+_export_lock = threading.Lock()
+
+
+def _ort_model_class():
+    # optimum[onnxruntime] is only needed when the onnx backend is selected
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as exc:
+        raise ImportError(
+            "The onnx generation backend needs optimum with ONNX Runtime: pip install optimum[onnxruntime]"
+        ) from exc
+    return ORTModelForSeq2SeqLM
+
+
+def export_onnx(model_path: str, output_dir: str = None) -> Path:
+    """
+    Export a seq2seq model to ONNX as separate encoder, decoder and
+    decoder-with-past (KV cache) graphs.
+    """
+    output_dir = Path(output_dir) if output_dir else Path(model_path) / ONNX_DIR
+    model = _ort_model_class().from_pretrained(model_path, export=True, use_cache=True)
+    with replaced_atomically(output_dir) as tmp_dir:
+        model.save_pretrained(tmp_dir)
+        (tmp_dir / _EXPORT_META).write_text(json.dumps({
+            "format": ONNX_FORMAT,
+            "source": weights_signature(Path(model_path)),
+        }))
+    return output_dir
+
+
+def _is_current(export_dir: Path, model_path: str) -> bool:
+    try:
+        meta = json.loads((export_dir / _EXPORT_META).read_text())
+    except (OSError, ValueError):
+        return False
+    return meta.get("format") == ONNX_FORMAT and meta.get("source") == weights_signature(Path(model_path))
+
+
+def load_onnx(model_path: str):
+    """
+    ONNX Runtime version of the model in `model_path`, exporting it first if the
+    export is missing or older than the weights. The returned model has the same
+    `generate` interface as the PyTorch one, so generate_corrections_batch works
+    unchanged; beam search reuses the decoder KV cache between steps.
+    """
+    ort_model_class = _ort_model_class()
+    export_dir = Path(model_path) / ONNX_DIR
+    with _export_lock:
+        if not _is_current(export_dir, model_path):
+            logger.warning("ONNX export %s is missing or stale, exporting %s", export_dir, model_path)
+            export_onnx(model_path, export_dir)
+    provider = "CUDAExecutionProvider" if torch.cuda.is_available() else "CPUExecutionProvider"
+    return ort_model_class.from_pretrained(export_dir, use_cache=True, provider=provider)
@@ -1,7 +1,6 @@
 import requests
-import spacy
 
-nlp = spacy.load("ro_core_news_sm")
+from src.nlp import load_spacy
 
 TEPROLIN_ENDPOINT = "http://localhost:5000/process"
 
@@ -25,7 +24,7 @@ def extract_teprolin_tokens(teprolin_result):
     return tokenized_data
 
 def spacy_extra_processing(text):
-    doc = nlp(text)
+    doc = load_spacy()(text)
     entities = [(ent.text, ent.label_) for ent in doc.ents]
     morphological_info = []
     for token in doc:
@@ -0,0 +1,69 @@
+import logging
+from pathlib import Path
+
+import torch
+
+from src.artifacts import replaced_atomically
+
+logger = logging.getLogger(__name__)
+
+# Quantized weights are saved next to the float weights they were derived from
+QUANTIZED_WEIGHTS = "model.int8.pt"
+QUANTIZED_FORMAT = 1
+# Float weight files a quantized artifact may be derived from
+_FLOAT_WEIGHTS = ("model.safetensors", "pytorch_model.bin")
+
+
+def quantize_dynamic_int8(model: torch.nn.Module) -> torch.nn.Module:
+    """
+    Dynamic int8 quantization of every nn.Linear (weights stored as int8,
+    activations quantized on the fly). CPU inference only.
+    """
+    model = model.to("cpu").eval()
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def is_quantized(model) -> bool:
+    return any(isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in model.modules())
+
+
+def weights_signature(model_path: Path) -> dict:
+    # Name, size and mtime of the float weights, so re-saved (e.g. active-learned) weights invalidate the artifact
+    for name in _FLOAT_WEIGHTS:
+        f = Path(model_path) / name
+        if f.exists():
+            st = f.stat()
+            return {"file": name, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    return {}
+
+
+def save_quantized(quantized: torch.nn.Module, model_path: str) -> Path:
+    path = Path(model_path) / QUANTIZED_WEIGHTS
+    with replaced_atomically(path) as tmp_path:
+        torch.save({
+            "format": QUANTIZED_FORMAT,
+            "torch": torch.__version__,
+            "source": weights_signature(Path(model_path)),
+            "state_dict": quantized.state_dict(),
+        }, tmp_path)
+    return path
+
+
+def load_quantized(model: torch.nn.Module, model_path: str) -> torch.nn.Module:
+    """
+    Quantize a freshly loaded float model, then take the saved int8 weights
+    (written by src/quantize_model.py) when they match the float weights, the
+    format and the torch version; otherwise the on-the-fly quantization is used.
+    """
+    quantized = quantize_dynamic_int8(model)
+    path = Path(model_path) / QUANTIZED_WEIGHTS
+    if not path.exists():
+        return quantized
+    saved = torch.load(path, map_location="cpu", weights_only=False)
+    expected = {"format": QUANTIZED_FORMAT, "torch": torch.__version__, "source": weights_signature(Path(model_path))}
+    for key, value in expected.items():
+        if saved.get(key) != value:
+            logger.warning("Quantized weights %s are stale (%s differs), quantizing on load", path, key)
+            return quantized
+    quantized.load_state_dict(saved["state_dict"])
+    return quantized
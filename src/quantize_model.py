@@ -0,0 +1,53 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from src.quantization import QUANTIZED_WEIGHTS, quantize_dynamic_int8, save_quantized
+
+ROOT = Path(__file__).resolve().parents[1]
+CLASSIFIER_PATH = ROOT / "src" / "detection" / "content" / "trained_model_V2_2"
+SEQ2SEQ_PATHS = [ROOT / "t5-grammar-finetuned", ROOT / "ro-word-correction"]
+
+def load_float(model_path: Path, classifier: bool):
+    if classifier:
+        from src.detection.detect import HFWrapperULMFiT
+        return HFWrapperULMFiT.from_pretrained(str(model_path))
+    from transformers import AutoModelForSeq2SeqLM
+    return AutoModelForSeq2SeqLM.from_pretrained(str(model_path))
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=f"Quantize the served models to int8 and save {QUANTIZED_WEIGHTS} next to their weights."
+    )
+    parser.add_argument(
+        "models",
+        help="Seq2seq model directories (default: t5-grammar-finetuned and ro-word-correction)",
+        nargs="*",
+        default=SEQ2SEQ_PATHS
+    )
+    parser.add_argument(
+        "--classifier",
+        help="HFWrapperULMFiT classifier directory (default: the one app.py serves)",
+        default=CLASSIFIER_PATH
+    )
+    parser.add_argument(
+        "--no-classifier",
+        help="Skip the classifier",
+        action="store_true"
+    )
+    args = parser.parse_args()
+
+    jobs = [(Path(p), False) for p in args.models]
+    if not args.no_classifier:
+        jobs.append((Path(args.classifier), True))
+
+    for model_path, classifier in jobs:
+        started = time.perf_counter()
+        quantized = quantize_dynamic_int8(load_float(model_path, classifier))
+        output = save_quantized(quantized, model_path)
+        print(f"Quantized {model_path!s} into {output!s} in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+# src/serving/__init__.py
+
+from .admission import (
+    AdmissionController,
+    DeadlineExceeded,
+    Overloaded,
+    check_deadline,
+    current_deadline,
+    deadline_scope,
+)
+from .batcher import GenerationBatcher
+from .components import ComponentNotReady, ComponentRegistry
+from .coalesce import SingleFlight
+from .cache import CorrectionCache, model_fingerprint, normalize_text
+from .documents import DocumentStore
+from .tiers import TierPolicy
+from .tracing import SamplingProfiler, Tracer
+
+__all__ = [
+    "AdmissionController",
+    "DeadlineExceeded",
+    "Overloaded",
+    "check_deadline",
+    "current_deadline",
+    "deadline_scope",
+    "GenerationBatcher",
+    "ComponentNotReady",
+    "ComponentRegistry",
+    "SingleFlight",
+    "CorrectionCache",
+    "model_fingerprint",
+    "normalize_text",
+    "DocumentStore",
+    "TierPolicy",
+    "SamplingProfiler",
+    "Tracer",
+]
@@ -0,0 +1,115 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+_current_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be queued; clients should retry after `retry_after` seconds."""
+
+    def __init__(self, message: str = "Server overloaded", retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's deadline passed before its inference could start."""
+
+    def __init__(self, message: str = "Request deadline exceeded", retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def current_deadline() -> Optional[float]:
+    """
+    Deadline (time.monotonic() based) of the request being handled in this context, if any.
+    """
+    return _current_deadline.get()
+
+
+def check_deadline(deadline: Optional[float] = None):
+    """
+    Raise DeadlineExceeded if the given (or the current request's) deadline already passed.
+    """
+    if deadline is None:
+        deadline = current_deadline()
+    if deadline is not None and time.monotonic() > deadline:
+        raise DeadlineExceeded()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]):
+    """
+    Make `deadline` the current request's deadline inside the block.
+    """
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+class AdmissionController:
+    """
+    Bounded admission in front of the inference engines.
+
+    At most `max_depth` requests are admitted at once; any request beyond that
+    is rejected immediately with Overloaded instead of piling up behind the
+    models. Every admitted request carries a deadline that the engines check
+    before spending inference time on it.
+    """
+
+    def __init__(self, max_depth: int = 32, default_deadline_ms: float = 15000, retry_after: int = 1):
+        self.max_depth = max_depth
+        self.default_deadline_ms = default_deadline_ms
+        self.retry_after = retry_after
+
+        self._depth = 0
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.rejected = 0
+
+    def acquire(self, deadline_ms: Optional[float] = None) -> float:
+        """
+        Take a slot and return the absolute deadline of the request.
+        `deadline_ms` can only shorten the default budget; values that are not
+        finite and positive are ignored. Must be paired with release().
+        """
+        with self._lock:
+            if self._depth >= self.max_depth:
+                self.rejected += 1
+                raise Overloaded(retry_after=self.retry_after)
+            self._depth += 1
+            self.admitted += 1
+        budget = self.default_deadline_ms
+        if deadline_ms is not None and math.isfinite(deadline_ms) and deadline_ms > 0:
+            budget = min(budget, deadline_ms)
+        return time.monotonic() + budget / 1000.0
+
+    def release(self):
+        with self._lock:
+            self._depth -= 1
+
+    @contextmanager
+    def admit(self, deadline_ms: Optional[float] = None):
+        deadline = self.acquire(deadline_ms)
+        try:
+            with deadline_scope(deadline):
+                yield deadline
+        finally:
+            self.release()
+
+    def depth(self) -> int:
+        return self._depth
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "depth": self._depth,
+            "max_depth": self.max_depth,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
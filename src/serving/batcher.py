@@ -0,0 +1,184 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from src.models import generate_corrections_batch
+from .admission import DeadlineExceeded, Overloaded
+from .metrics import GENERATION_BATCH_SIZE, timed
+from .tracing import GenerationProbe, Span, activate, current_span
+
+
+@dataclass
+class GenerationJob:
+    text: str
+    num_suggestions: int
+    deadline: Optional[float] = None
+    future: Future = field(default_factory=Future)
+    # trace span of the submitting request, if it is traced
+    span: Optional[Span] = None
+    queued: float = field(default_factory=time.monotonic)
+
+
+class GenerationBatcher:
+    """
+    Central scheduler for T5 generation.
+
+    Requests submit single texts; a background worker collects them for at most
+    `max_wait_ms` (or until `max_batch_size` jobs are waiting), runs one padded
+    `generate` call per group of jobs sharing the same decoding parameters and
+    resolves every job's future with its own suggestions.
+
+    The queue holds at most `max_queue_size` jobs (submit raises Overloaded beyond
+    that) and jobs whose deadline passed while queued are dropped before inference.
+
+    When any job of a batch belongs to a traced request, the batch is timed stage
+    by stage and the resulting span is attached to each traced request; in that
+    case `generate_fn` receives an extra `logits_processor` argument.
+
+    `stage` names the batcher in latency metrics, traces and its worker thread,
+    so several batchers (sentence and word models) can run side by side.
+    `on_wait`, if given, is called with the seconds each job spent queued.
+    """
+
+    def __init__(
+        self,
+        model,
+        tokenizer,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10.0,
+        max_queue_size: int = 0,
+        generate_fn: Callable = generate_corrections_batch,
+        stage: str = "generate",
+        on_wait: Optional[Callable[[float], None]] = None,
+    ):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.generate_fn = generate_fn
+        self.stage = stage
+        self.on_wait = on_wait
+
+        self._queue: "queue.Queue[GenerationJob]" = queue.Queue(maxsize=max_queue_size)
+        self._worker = threading.Thread(target=self._run, name=f"{stage}-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, text: str, num_suggestions: int = 3, deadline: Optional[float] = None) -> Future:
+        """
+        Queue a text for generation and return a future resolving to its suggestions.
+        `deadline` is a time.monotonic() timestamp after which the job is not worth running.
+        """
+        job = GenerationJob(text=text, num_suggestions=num_suggestions, deadline=deadline, span=current_span())
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            raise Overloaded("Generation queue is full")
+        return job.future
+
+    def generate(self, text: str, num_suggestions: int = 3, deadline: Optional[float] = None) -> List[str]:
+        """
+        Blocking equivalent of `generate_corrections` routed through the scheduler.
+        """
+        return self.submit(text, num_suggestions, deadline).result()
+
+    def generate_many(
+        self,
+        texts: List[str],
+        num_suggestions: int = 3,
+        deadline: Optional[float] = None,
+    ) -> List[List[str]]:
+        """
+        Submit several texts at once so they can share batches, and wait for all of them.
+        """
+        futures = []
+        try:
+            for t in texts:
+                futures.append(self.submit(t, num_suggestions, deadline))
+        except Overloaded:
+            for f in futures:
+                f.cancel()
+            raise
+        return [f.result() for f in futures]
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _collect(self) -> List[GenerationJob]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+
+            # only jobs with identical decoding parameters can share a generate call
+            groups: Dict[int, List[GenerationJob]] = {}
+            for job in batch:
+                if job.future.set_running_or_notify_cancel():
+                    groups.setdefault(job.num_suggestions, []).append(job)
+
+            for num_suggestions, jobs in groups.items():
+                self._execute(jobs, num_suggestions)
+
+    def _execute(self, jobs: List[GenerationJob], num_suggestions: int):
+        # drop jobs whose request gave up while they were waiting
+        now = time.monotonic()
+        live = []
+        for job in jobs:
+            if self.on_wait is not None:
+                self.on_wait(now - job.queued)
+            if job.deadline is not None and now > job.deadline:
+                job.future.set_exception(DeadlineExceeded())
+            else:
+                live.append(job)
+        jobs = live
+        if not jobs:
+            return
+
+        GENERATION_BATCH_SIZE.observe(len(jobs), stage=self.stage)
+        traced = [job.span for job in jobs if job.span is not None]
+        batch_span = Span(f"{self.stage}_batch", batch_size=len(jobs), num_suggestions=num_suggestions) if traced else None
+        try:
+            with activate(batch_span), timed(self.stage):
+                if batch_span is None:
+                    results = self.generate_fn(
+                        self.model,
+                        self.tokenizer,
+                        [job.text for job in jobs],
+                        num_suggestions=num_suggestions,
+                    )
+                else:
+                    started = time.perf_counter()
+                    with GenerationProbe(self.model) as probe:
+                        results = self.generate_fn(
+                            self.model,
+                            self.tokenizer,
+                            [job.text for job in jobs],
+                            num_suggestions=num_suggestions,
+                            logits_processor=[probe],
+                        )
+                    probe.attach(current_span(), started, time.perf_counter())
+        except Exception as exc:
+            for job in jobs:
+                job.future.set_exception(exc)
+            return
+        finally:
+            if batch_span is not None:
+                batch_span.finish()
+                for parent in traced:
+                    parent.children.append(batch_span)
+
+        for job, suggestions in zip(jobs, results):
+            job.future.set_result(suggestions)
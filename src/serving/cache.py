@@ -0,0 +1,250 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .metrics import timed
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS correction_cache (
+    key TEXT PRIMARY KEY,
+    cache TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS correction_cache_created ON correction_cache (cache, created);
+"""
+
+_MISSING = object()
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form used for cache keys: NFC, trimmed, whitespace runs collapsed.
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text).strip())
+
+
+def model_fingerprint(model_path: str) -> str:
+    """
+    Cheap fingerprint of a saved model directory, built from the name, size and
+    modification time of its files. Changes whenever the weights are re-saved.
+    """
+    h = hashlib.sha1()
+    root = Path(model_path)
+    if root.is_dir():
+        for f in sorted(root.iterdir()):
+            if f.is_file():
+                st = f.stat()
+                h.update(f"{f.name}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return h.hexdigest()[:16]
+
+
+class CorrectionCache:
+    """
+    Two-tier cache for model outputs.
+
+    The first tier is an in-process LRU with a TTL; the optional second tier is a
+    SQLite table shared by every worker. Keys combine the cache name, the model
+    fingerprint, the normalized text and the decoding parameters, so outputs of
+    an older model version are never returned.
+
+    At most every `purge_interval` seconds a store also deletes expired rows and
+    the oldest ones beyond `max_disk_entries`. Each thread keeps its own
+    connection to the SQLite file.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fingerprint: str,
+        max_entries: int = 10000,
+        ttl_seconds: float = 24 * 3600,
+        db_path: Optional[str] = None,
+        max_disk_entries: int = 200000,
+        purge_interval: float = 60.0,
+    ):
+        self.name = name
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+        self.purge_interval = purge_interval
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._last_purge = 0.0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.db_path:
+            conn = self._connection()
+            conn.executescript(CACHE_SCHEMA)
+            conn.commit()
+
+    def key(self, text: str, params: Optional[Dict] = None) -> str:
+        payload = json.dumps(
+            [self.name, self.fingerprint, normalize_text(text), params or {}],
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, text: str, params: Optional[Dict] = None, default=None):
+        value = self._lookup([self.key(text, params)])
+        return value[0] if value[0] is not _MISSING else default
+
+    def set(self, text: str, params: Optional[Dict], value):
+        self._store({self.key(text, params): value})
+
+    def get_or_compute_many(self, texts: List[str], params: Optional[Dict], compute_fn: Callable) -> List:
+        """
+        Return cached values for `texts`, calling `compute_fn` once with the
+        texts that missed (deduplicated by key) and caching its results.
+        """
+        keys = [self.key(t, params) for t in texts]
+        values = self._lookup(keys)
+
+        missing: "OrderedDict[str, str]" = OrderedDict()
+        for k, t, v in zip(keys, texts, values):
+            if v is _MISSING and k not in missing:
+                missing[k] = t
+
+        if missing:
+            computed = dict(zip(missing.keys(), compute_fn(list(missing.values()))))
+            self._store(computed)
+            values = [computed[k] if v is _MISSING else v for k, v in zip(keys, values)]
+        return values
+
+    def set_fingerprint(self, fingerprint: str):
+        """
+        Switch to a new model version, dropping every entry of the previous one.
+        """
+        if fingerprint == self.fingerprint:
+            return
+        with self._lock:
+            self.fingerprint = fingerprint
+            self._entries.clear()
+        if self.db_path:
+            conn = self._connection()
+            conn.execute(
+                "DELETE FROM correction_cache WHERE cache = ? AND fingerprint != ?",
+                (self.name, fingerprint),
+            )
+            conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+        }
+
+    def _lookup(self, keys: List[str]) -> List:
+        now = time.time()
+        values = []
+        with self._lock:
+            for k in keys:
+                entry = self._entries.get(k)
+                if entry is not None and now - entry[0] <= self.ttl:
+                    self._entries.move_to_end(k)
+                    self.memory_hits += 1
+                    values.append(entry[1])
+                else:
+                    if entry is not None:
+                        del self._entries[k]
+                    values.append(_MISSING)
+
+        pending = [k for k, v in zip(keys, values) if v is _MISSING]
+        found = {}
+        if pending and self.db_path:
+            with timed("sqlite"):
+                found = self._disk_get(pending, now)
+
+        result = []
+        for k, v in zip(keys, values):
+            if v is _MISSING and k in found:
+                v = found[k]
+                self.disk_hits += 1
+            elif v is _MISSING:
+                self.misses += 1
+            result.append(v)
+
+        if found:
+            self._remember(found)
+        return result
+
+    def _store(self, items: Dict[str, object]):
+        self._remember(items)
+        if self.db_path and items:
+            with timed("sqlite"):
+                self._disk_put(items)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            self._local.conn = conn
+        return conn
+
+    def _disk_put(self, items: Dict[str, object]):
+        now = time.time()
+        conn = self._connection()
+        conn.executemany(
+            "INSERT OR REPLACE INTO correction_cache (key, cache, fingerprint, value, created) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (k, self.name, self.fingerprint, json.dumps(v, ensure_ascii=False), now)
+                for k, v in items.items()
+            ],
+        )
+        if now - self._last_purge >= self.purge_interval:
+            self._last_purge = now
+            self._purge(conn, now)
+        conn.commit()
+
+    def _purge(self, conn: sqlite3.Connection, now: float):
+        conn.execute(
+            "DELETE FROM correction_cache WHERE cache = ? AND created < ?",
+            (self.name, now - self.ttl),
+        )
+        conn.execute(
+            "DELETE FROM correction_cache WHERE cache = ? AND key IN ("
+            "SELECT key FROM correction_cache WHERE cache = ? ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (self.name, self.name, self.max_disk_entries),
+        )
+
+    def _remember(self, items: Dict[str, object]):
+        now = time.time()
+        with self._lock:
+            for k, v in items.items():
+                self._entries[k] = (now, v)
+                self._entries.move_to_end(k)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_get(self, keys: List[str], now: float) -> Dict[str, object]:
+        if not self.db_path:
+            return {}
+        rows = []
+        conn = self._connection()
+        # stay below SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows += conn.execute(
+                "SELECT key, value FROM correction_cache WHERE created >= ? AND key IN (%s)"
+                % ",".join("?" * len(chunk)),
+                [now - self.ttl, *chunk],
+            ).fetchall()
+        return {k: json.loads(v) for k, v in rows}
@@ -0,0 +1,125 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, Optional
+
+
+class ComponentNotReady(Exception):
+    """Raised when a request needs a component that is still loading (or failed to load)."""
+
+    def __init__(self, message: str = "Component not ready", retry_after: int = 5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Component:
+    def __init__(self, name: str, loader: Callable):
+        self.name = name
+        self.loader = loader
+        self.future: Optional[Future] = None
+        self.started: Optional[float] = None
+        self.seconds: Optional[float] = None
+
+
+class ComponentRegistry:
+    """
+    Named, lazily loaded heavy dependencies (models, dictionaries, lexicons).
+
+    Each component is loaded at most once, on its own thread, either for all
+    components at startup (`start()`) or the first time it is needed. Loaders
+    may `get()` other components, so dependencies load in parallel and a
+    dependent component becomes ready as soon as its own inputs are.
+    Requests check `require()` and are answered with ComponentNotReady (503)
+    while the components they need are still loading, instead of the whole
+    server waiting for every model.
+    """
+
+    def __init__(self, retry_after: int = 5):
+        self.retry_after = retry_after
+        self._components: Dict[str, _Component] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable):
+        if name in self._components:
+            raise ValueError(f"Component {name!r} is already registered")
+        self._components[name] = _Component(name, loader)
+
+    def start(self, names: Optional[Iterable[str]] = None):
+        """
+        Begin loading the given (default: all) components in the background.
+        """
+        for name in names if names is not None else list(self._components):
+            self._ensure_loading(name)
+
+    def _ensure_loading(self, name: str) -> Future:
+        component = self._components[name]
+        with self._lock:
+            if component.future is not None:
+                return component.future
+            component.future = Future()
+            component.started = time.monotonic()
+        threading.Thread(target=self._load, args=(component,), name=f"load-{name}", daemon=True).start()
+        return component.future
+
+    def _load(self, component: _Component):
+        try:
+            value = component.loader()
+        except BaseException as exc:
+            component.seconds = time.monotonic() - component.started
+            component.future.set_exception(exc)
+        else:
+            component.seconds = time.monotonic() - component.started
+            component.future.set_result(value)
+
+    def get(self, name: str, timeout: Optional[float] = None):
+        """
+        Return the loaded component, loading it (or waiting for its load) if needed.
+        """
+        return self._ensure_loading(name).result(timeout)
+
+    def peek(self, name: str):
+        """
+        The component if it is already loaded, otherwise None; never blocks.
+        """
+        future = self._components[name].future
+        if future is None or not future.done() or future.exception() is not None:
+            return None
+        return future.result()
+
+    def is_ready(self, name: str) -> bool:
+        future = self._components[name].future
+        return future is not None and future.done() and future.exception() is None
+
+    def require(self, *names: str):
+        """
+        Raise ComponentNotReady unless all named components are loaded; starts any
+        load that has not begun yet.
+        """
+        for name in names:
+            future = self._ensure_loading(name)
+            if not future.done():
+                raise ComponentNotReady(f"Component {name!r} is still loading", self.retry_after)
+            if future.exception() is not None:
+                raise ComponentNotReady(f"Component {name!r} failed to load: {future.exception()}", self.retry_after)
+
+    def wait(self, names: Optional[Iterable[str]] = None, timeout: Optional[float] = None):
+        """
+        Block until the given (default: all) components are loaded; re-raises load errors.
+        """
+        for name in names if names is not None else list(self._components):
+            self.get(name, timeout)
+
+    def status(self) -> Dict[str, Dict]:
+        out = {}
+        for name, component in self._components.items():
+            future = component.future
+            if future is None:
+                state = {"state": "pending"}
+            elif not future.done():
+                state = {"state": "loading", "seconds": round(time.monotonic() - component.started, 1)}
+            elif future.exception() is not None:
+                state = {"state": "failed", "error": str(future.exception())}
+            else:
+                state = {"state": "ready", "seconds": round(component.seconds, 1)}
+            out[name] = state
+        return out
@@ -0,0 +1,57 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from .cache import normalize_text
+
+
+def sentence_hash(sentence: str) -> str:
+    return hashlib.sha1(normalize_text(sentence).encode("utf-8")).hexdigest()
+
+
+class DocumentStore:
+    """
+    Last known /check state of every document a client re-sends.
+
+    For each document id it remembers the hash of every sentence of the latest
+    revision together with its verdict and correction, so that a re-check only
+    has to run the models on sentences that are new or were edited.
+    """
+
+    def __init__(self, max_documents: int = 1000, ttl_seconds: float = 24 * 3600):
+        self.max_documents = max_documents
+        self.ttl = ttl_seconds
+        self._documents: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, document_id: str, sentences: List[str]) -> List[Optional[Dict]]:
+        """
+        Return the stored result of every sentence, or None for the ones that must be checked.
+        """
+        with self._lock:
+            entry = self._documents.get(document_id)
+            if entry is None or time.time() - entry[0] > self.ttl:
+                return [None] * len(sentences)
+            self._documents.move_to_end(document_id)
+            known = entry[1]
+        return [known.get(sentence_hash(s)) for s in sentences]
+
+    def update(self, document_id: str, sentences: List[str], results: List[Dict]):
+        """
+        Replace the document's state with the sentences of its current revision.
+        """
+        state = {sentence_hash(s): r for s, r in zip(sentences, results)}
+        with self._lock:
+            self._documents[document_id] = (time.time(), state)
+            self._documents.move_to_end(document_id)
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._documents.clear()
+
+    def __len__(self):
+        return len(self._documents)
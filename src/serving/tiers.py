@@ -0,0 +1,68 @@
+import threading
+from typing import Dict
+
+FULL = "full"
+REDUCED = "reduced"
+EMERGENCY = "emergency"
+
+TIERS = (FULL, REDUCED, EMERGENCY)
+
+
+class TierPolicy:
+    """
+    Picks how much model work a correction request may use.
+
+    - full:      beam search with several suggestions plus BLEU ranking
+    - reduced:   greedy decoding, a single suggestion
+    - emergency: token-level dictionary correction only, no neural generation
+
+    The tier is chosen from the number of requests currently admitted and from a
+    moving average of how long generation jobs wait in the batcher queue;
+    whichever signal is worse wins. The queue wait only counts once at least
+    `contention_depth` requests are admitted, so a single slow request on an
+    idle server never degrades the next one.
+    """
+
+    def __init__(
+        self,
+        reduced_depth: int = 8,
+        emergency_depth: int = 24,
+        contention_depth: int = 4,
+        reduced_wait_ms: float = 1000,
+        emergency_wait_ms: float = 3000,
+        smoothing: float = 0.2,
+    ):
+        self.reduced_depth = reduced_depth
+        self.emergency_depth = emergency_depth
+        self.contention_depth = contention_depth
+        self.reduced_wait = reduced_wait_ms / 1000.0
+        self.emergency_wait = emergency_wait_ms / 1000.0
+        self.smoothing = smoothing
+
+        self._wait = 0.0
+        self._lock = threading.Lock()
+        self.selected: Dict[str, int] = {tier: 0 for tier in TIERS}
+
+    def record_wait(self, seconds: float):
+        """
+        Feed the time one generation job spent queued (GenerationBatcher `on_wait`).
+        """
+        with self._lock:
+            self._wait += self.smoothing * (seconds - self._wait)
+
+    def select(self, depth: int) -> str:
+        wait = self._wait if depth >= self.contention_depth else 0.0
+        if depth >= self.emergency_depth or wait >= self.emergency_wait:
+            tier = EMERGENCY
+        elif depth >= self.reduced_depth or wait >= self.reduced_wait:
+            tier = REDUCED
+        else:
+            tier = FULL
+        self.selected[tier] += 1
+        return tier
+
+    def stats(self) -> Dict:
+        return {
+            "queue_wait_ewma_ms": round(self._wait * 1000, 1),
+            "selected": dict(self.selected),
+        }
@@ -0,0 +1,257 @@
+import cProfile
+import itertools
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("trace_span", default=None)
+_trace_ids = itertools.count(1)
+
+
+class Span:
+    """
+    One timed node of a request trace, with wall and CPU time of the thread that ran it.
+    """
+
+    def __init__(self, name: str, **attrs):
+        self.name = name
+        self.attrs = attrs
+        self.children: List["Span"] = []
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self._cpu_start = time.thread_time()
+        self.cpu: Optional[float] = None
+
+    def finish(self, end: Optional[float] = None):
+        self.end = end if end is not None else time.perf_counter()
+        self.cpu = time.thread_time() - self._cpu_start
+
+    def to_dict(self, origin: Optional[float] = None) -> Dict:
+        origin = self.start if origin is None else origin
+        end = self.end if self.end is not None else time.perf_counter()
+        node = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "wall_ms": round((end - self.start) * 1000, 3),
+        }
+        if self.cpu is not None:
+            node["cpu_ms"] = round(self.cpu * 1000, 3)
+        if self.attrs:
+            node["attrs"] = self.attrs
+        if self.children:
+            node["children"] = [c.to_dict(origin) for c in self.children]
+        return node
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Record the enclosed block as a child of the current span. Does nothing
+    (beyond one context-variable read) when the request is not traced.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    node = Span(name, **attrs)
+    parent.children.append(node)
+    token = _current_span.set(node)
+    try:
+        yield node
+    finally:
+        _current_span.reset(token)
+        node.finish()
+
+
+@contextmanager
+def activate(node: Optional[Span]):
+    """
+    Make `node` the current span of this thread, e.g. in a worker serving a traced request.
+    """
+    token = _current_span.set(node)
+    try:
+        yield node
+    finally:
+        _current_span.reset(token)
+
+
+class GenerationProbe:
+    """
+    Times the stages of one traced `generate` call: everything up to the encoder
+    forward (tokenization, input preparation), the encoder itself, every decoding
+    step and the final detokenization. Registered as an encoder hook and passed
+    to generate as a logits processor, which is called once per decoding step.
+    Encoders that are not torch modules (ONNX Runtime sessions) cannot be hooked;
+    their time is then part of the first decoding step.
+    """
+
+    def __init__(self, model):
+        self.encoder = model.get_encoder()
+        self.marks: List[tuple] = []
+        self._hooks = []
+
+    def __enter__(self):
+        if not hasattr(self.encoder, "register_forward_pre_hook"):
+            return self
+        self._hooks = [
+            self.encoder.register_forward_pre_hook(lambda *_: self.marks.append(("encoder_start", time.perf_counter()))),
+            self.encoder.register_forward_hook(lambda *_: self.marks.append(("encoder_end", time.perf_counter()))),
+        ]
+        return self
+
+    def __exit__(self, *exc):
+        for hook in self._hooks:
+            hook.remove()
+        self._hooks = []
+
+    def __call__(self, input_ids, scores):
+        self.marks.append(("step", time.perf_counter()))
+        return scores
+
+    def attach(self, parent: Span, start: float, end: float):
+        """
+        Add the recorded stages to `parent` as child spans (wall time only).
+        """
+        def child(name, a, b, **attrs):
+            node = Span(name, **attrs)
+            node.start = a
+            node.end = b
+            parent.children.append(node)
+
+        cursor = start
+        step = 0
+        for kind, t in self.marks:
+            if kind == "encoder_start":
+                child("tokenize", cursor, t)
+            elif kind == "encoder_end":
+                child("encoder", cursor, t)
+            else:
+                child("decode_step", cursor, t, step=step)
+                step += 1
+            cursor = t
+        child("detokenize", cursor, end)
+
+
+class Tracer:
+    """
+    Opt-in per-request tracing with a bounded store of finished traces.
+
+    A request is traced when it asks for it (header) or falls in the
+    `sample_rate` fraction; finished traces are kept in memory, newest first,
+    and can be fetched by id.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, max_traces: int = 100):
+        self.sample_rate = sample_rate
+        self.max_traces = max_traces
+        self._traces: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def should_trace(self, requested: bool = False) -> bool:
+        return requested or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def start(self, name: str, **attrs):
+        """
+        Open the root span of a request and make it current. Returns (trace_id, root, token).
+        """
+        trace_id = f"{int(time.time())}-{next(_trace_ids)}"
+        root = Span(name, **attrs)
+        return trace_id, root, _current_span.set(root)
+
+    def finish(self, trace_id: str, root: Span, token) -> Dict:
+        _current_span.reset(token)
+        root.finish()
+        trace = {"id": trace_id, **root.to_dict()}
+        with self._lock:
+            self._traces[trace_id] = trace
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+        return trace
+
+    def get(self, trace_id: str) -> Optional[Dict]:
+        return self._traces.get(trace_id)
+
+    def recent(self, limit: int = 20) -> List[Dict]:
+        with self._lock:
+            traces = list(self._traces.values())
+        return [
+            {"id": t["id"], "name": t["name"], "wall_ms": t["wall_ms"]}
+            for t in reversed(traces[-limit:])
+        ]
+
+
+class SamplingProfiler:
+    """
+    Captures a cProfile or torch.profiler dump for a sampled fraction of requests
+    into `directory`, keeping only the newest `max_files` dumps.
+
+    cProfile only sees the request thread (generation in the batcher shows up as
+    waiting); the "torch" mode records operator events from every thread.
+    """
+
+    def __init__(self, directory: str = "profiles", sample_rate: float = 0.0, mode: str = "cprofile", max_files: int = 50):
+        if mode not in ("cprofile", "torch"):
+            raise ValueError(f"Unknown profiler mode {mode!r}")
+        self.directory = Path(directory)
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.max_files = max_files
+        # only one profile at a time; cProfile and torch.profiler are process-wide
+        self._busy = threading.Lock()
+
+    def should_profile(self, requested: bool = False) -> bool:
+        return requested or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def start(self):
+        """
+        Start profiling; returns a handle for stop(), or None if another profile is running.
+        """
+        if not self._busy.acquire(blocking=False):
+            return None
+        if self.mode == "torch":
+            from torch.profiler import profile, ProfilerActivity
+
+            prof = profile(activities=[ProfilerActivity.CPU], record_shapes=True)
+            prof.__enter__()
+        else:
+            prof = cProfile.Profile()
+            prof.enable()
+        return prof
+
+    def stop(self, prof, name: str) -> str:
+        """
+        Stop the profile and write it to the rotating directory; returns the file path.
+        """
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            stem = f"{time.strftime('%Y%m%d-%H%M%S')}-{name}-{next(_trace_ids)}"
+            if self.mode == "torch":
+                prof.__exit__(None, None, None)
+                path = self.directory / f"{stem}.json"
+                prof.export_chrome_trace(str(path))
+            else:
+                prof.disable()
+                path = self.directory / f"{stem}.prof"
+                prof.dump_stats(str(path))
+            self._rotate()
+            return str(path)
+        finally:
+            self._busy.release()
+
+    def _rotate(self):
+        dumps = sorted(
+            (p for p in self.directory.iterdir() if p.suffix in (".prof", ".json")),
+            key=os.path.getmtime,
+        )
+        for old in dumps[:-self.max_files]:
+            old.unlink(missing_ok=True)
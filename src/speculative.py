@@ -0,0 +1,105 @@
+from typing import List
+
+import torch
+from transformers import LogitsProcessorList, NoRepeatNGramLogitsProcessor
+from transformers.cache_utils import DynamicCache, EncoderDecoderCache
+
+# Draft at most this many tokens per decoder pass, continuing the longest recent n-gram
+# (up to COPY_MAX_NGRAM tokens) of the output that also occurs in the source.
+COPY_DRAFT_TOKENS = 10
+COPY_MAX_NGRAM = 3
+
+
+def _draft(generated: List[int], source: List[int], num_tokens: int, max_ngram: int) -> List[int]:
+    # The tokens that follow the last occurrence in the source of the output's trailing n-gram
+    if num_tokens <= 0:
+        return []
+    for n in range(min(max_ngram, len(generated)), 0, -1):
+        tail = generated[-n:]
+        for start in range(len(source) - n, -1, -1):
+            if source[start:start + n] == tail:
+                follow = source[start + n:start + n + num_tokens]
+                if follow:
+                    return follow
+    return []
+
+
+def generate_copy_speculative(
+    model,
+    tokenizer,
+    texts,
+    logits_processor=None,
+    extra_length: int = 50,
+    no_repeat_ngram_size: int = 3,
+    num_draft_tokens: int = COPY_DRAFT_TOKENS,
+    max_ngram: int = COPY_MAX_NGRAM,
+) -> List[str]:
+    """
+    Greedy correction of every text with input-copy speculative decoding.
+
+    Corrections mostly copy the input, so instead of one decoder pass per token,
+    each pass feeds the last output token plus a draft copied from the source
+    (the continuation of the output's trailing n-gram) and checks every drafted
+    position against the model's own greedy choice. The matching prefix is kept
+    together with the model's token at the first mismatch, and the KV cache is
+    cropped back to the kept tokens. Where nothing matches, a pass yields one
+    token, exactly like plain decoding.
+
+    The result is the same greedy search (with the same no-repeat-ngram rule)
+    as generate(num_beams=1), so on a float model outputs agree up to
+    floating-point ties. Not on an int8 dynamically quantized one: activations
+    are quantized with per-tensor scales, which change with the number of
+    positions fed per pass, and the outputs drift from plain greedy decoding.
+    Rows are decoded one after the other after a shared encoder pass, so this
+    pays off when passes saved per row outweigh losing the batched decoder.
+    Extra logits processors (the tracing probe) are called once per decoder pass.
+    """
+    if not texts:
+        return []
+    device = model.device
+    inputs = tokenizer(["grammar: " + t for t in texts], return_tensors="pt", padding=True).to(device)
+    start_id = model.config.decoder_start_token_id
+    eos_id = model.config.eos_token_id
+    no_repeat = LogitsProcessorList([NoRepeatNGramLogitsProcessor(no_repeat_ngram_size)])
+    extra = LogitsProcessorList(logits_processor or [])
+
+    results = []
+    with torch.inference_mode():
+        encoded = model.get_encoder()(**inputs).last_hidden_state
+        for row in range(len(texts)):
+            length = int(inputs["attention_mask"][row].sum())
+            source = inputs["input_ids"][row, :length].tolist()
+            # capped by the row's own length, so the output does not depend on the batch
+            max_length = length + extra_length
+            encoder_outputs = (encoded[row:row + 1, :length],)
+            attention_mask = inputs["attention_mask"][row:row + 1, :length]
+
+            generated = [start_id]
+            # always holds the decoder states of generated[:-1]
+            past = EncoderDecoderCache(DynamicCache(), DynamicCache())
+            while len(generated) < max_length and generated[-1] != eos_id:
+                draft = _draft(generated, source, min(num_draft_tokens, max_length - len(generated) - 1), max_ngram)
+                step = torch.tensor([[generated[-1]] + draft], device=device)
+                out = model(
+                    encoder_outputs=encoder_outputs,
+                    attention_mask=attention_mask,
+                    decoder_input_ids=step,
+                    past_key_values=past,
+                    use_cache=True,
+                )
+                logits = out.logits[0]
+                extra(torch.tensor([generated], device=device), logits[-1:])
+
+                for i in range(len(draft) + 1):
+                    scores = no_repeat(torch.tensor([generated], device=device), logits[i:i + 1].float())
+                    token = int(scores.argmax(-1))
+                    generated.append(token)
+                    if token == eos_id or len(generated) >= max_length:
+                        break
+                    if i == len(draft) or token != draft[i]:
+                        break
+                # drop the states of rejected draft tokens
+                past.crop(len(generated) - 1)
+
+            results.append(tokenizer.decode(generated, skip_special_tokens=True))
+    return results
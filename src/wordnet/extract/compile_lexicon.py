@@ -0,0 +1,35 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+from src.wordnet.lexicon import LEXICON_PATH, RO_DIX_PATH, compile_lexicon
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile the Apertium ro.dix into the morphological lexicon used for reinflection."
+    )
+    parser.add_argument(
+        "dix",
+        help="Path to ro.dix (default: the one next to this script)",
+        nargs="?",
+        default=RO_DIX_PATH
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Output lexicon (default: ro_lexicon.sqlite next to the dictionary)",
+        default=None
+    )
+    args = parser.parse_args()
+
+    dix_path = Path(args.dix)
+    output = Path(args.output) if args.output else dix_path.with_name(LEXICON_PATH.name)
+
+    started = time.perf_counter()
+    compile_lexicon(dix_path, output)
+    print(f"Compiled {dix_path!s} into {output!s} in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
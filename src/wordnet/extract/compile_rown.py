@@ -0,0 +1,35 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+from src.wordnet.literals_lookup import ROW_XML_PATH, ROWN_INDEX_PATH, compile_rown
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile rown.xml into the indexed SQLite store used by literals_lookup."
+    )
+    parser.add_argument(
+        "xml",
+        help="Path to rown.xml (default: the one next to this script)",
+        nargs="?",
+        default=ROW_XML_PATH
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Output index (default: rown.sqlite next to the XML)",
+        default=None
+    )
+    args = parser.parse_args()
+
+    xml_path = Path(args.xml)
+    output = Path(args.output) if args.output else (ROWN_INDEX_PATH if xml_path == ROW_XML_PATH else xml_path.with_suffix(".sqlite"))
+
+    started = time.perf_counter()
+    compile_rown(xml_path, output)
+    print(f"Compiled {xml_path!s} into {output!s} in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
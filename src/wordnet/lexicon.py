@@ -0,0 +1,194 @@
+import functools
+import itertools
+import sqlite3
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.artifacts import CompiledSQLite, replaced_atomically, source_meta
+
+RO_DIX_PATH = Path(__file__).resolve().parents[2] / "src" / "wordnet" / "extract" / "ro.dix"
+# Compiled form table produced by extract/compile_lexicon.py
+LEXICON_PATH = RO_DIX_PATH.with_name("ro_lexicon.sqlite")
+LEXICON_FORMAT = 1
+
+# Apertium tags -> the Universal Dependencies names and values spaCy (and reinflect) use
+POS_TAGS = {"n": "NOUN", "np": "PROPN", "adj": "ADJ", "adv": "ADV", "vblex": "VERB", "vbser": "AUX",
+            "vbhaver": "AUX", "vbmod": "VERB", "prn": "PRON", "det": "DET", "pr": "ADP", "num": "NUM"}
+FEATURE_TAGS = {
+    "m":   ("Gender", "Masc"), "f":  ("Gender", "Fem"), "nt":  ("Gender", "Neut"),
+    "sg":  ("Number", "Sing"), "pl": ("Number", "Plur"),
+    "def": ("Definite", "Def"), "ind": ("Definite", "Ind"),
+    "nom": ("Case", "Acc,Nom"), "dg": ("Case", "Dat,Gen"), "voc": ("Case", "Voc"),
+}
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE form (surface TEXT NOT NULL, lemma TEXT NOT NULL, pos TEXT NOT NULL,
+                   gender TEXT, number TEXT, definite TEXT, "case" TEXT,
+                   analysis INTEGER NOT NULL, generation INTEGER NOT NULL);
+CREATE INDEX form_by_surface ON form (surface);
+CREATE INDEX form_by_lemma ON form (lemma, pos, number, definite, "case");
+"""
+
+
+def _text(el) -> Optional[str]:
+    # Plain text of an <i>/<l>/<r> element; None for multiword or joined forms
+    if el is None:
+        return ""
+    parts = [el.text or ""]
+    for child in el:
+        if child.tag != "s":
+            return None
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+def _combine(directions) -> Optional[str]:
+    # An expansion is restricted if any part of it is; opposite restrictions cancel it out
+    restricted = {d for d in directions if d}
+    if len(restricted) > 1:
+        return "none"
+    return restricted.pop() if restricted else None
+
+
+def _expand(entry, pardefs) -> List[Tuple[str, str, List[str], Optional[str]]]:
+    """
+    All (surface, lemma, tags, direction) an Apertium <e> produces, with paradigms expanded.
+    """
+    parts = []
+    for child in entry:
+        if child.tag == "i":
+            text = _text(child)
+            if text is None:
+                return []
+            parts.append([(text, text, [], None)])
+        elif child.tag == "p":
+            left, right = _text(child.find("l")), _text(child.find("r"))
+            if left is None or right is None:
+                return []
+            parts.append([(left, right, [s.get("n") for s in child.find("r").iter("s")], None)])
+        elif child.tag == "par":
+            parts.append(pardefs.get(child.get("n"), []))
+        else:
+            # regular expressions, groups and other constructs never describe a single word
+            return []
+    return [
+        (
+            "".join(p[0] for p in combo),
+            "".join(p[1] for p in combo),
+            [t for p in combo for t in p[2]],
+            _combine([entry.get("r")] + [p[3] for p in combo]),
+        )
+        for combo in itertools.product(*parts)
+    ]
+
+
+def compile_lexicon(dix_path: Path = RO_DIX_PATH, lexicon_path: Path = LEXICON_PATH) -> Path:
+    """
+    Expand every paradigm of the Apertium Romanian dictionary into a table of
+    attested forms: surface, lemma, POS, gender, number, definiteness, case.
+    Forms restricted to analysis (r="LR") are not used for generation and vice
+    versa.
+    """
+    root = ET.parse(dix_path).getroot()
+    pardefs: Dict[str, list] = {}
+    for pardef in root.find("pardefs"):
+        pardefs[pardef.get("n")] = [alt for e in pardef.findall("e") for alt in _expand(e, pardefs)]
+
+    rows = []
+    for section in root.findall("section"):
+        for e in section.findall("e"):
+            for surface, lemma, tags, direction in _expand(e, pardefs):
+                if not tags or not surface or " " in surface or direction == "none":
+                    continue
+                feats = dict(FEATURE_TAGS[t] for t in tags[1:] if t in FEATURE_TAGS)
+                rows.append((
+                    surface, lemma, POS_TAGS.get(tags[0], tags[0].upper()),
+                    feats.get("Gender"), feats.get("Number"), feats.get("Definite"), feats.get("Case"),
+                    int(direction != "RL"), int(direction != "LR"),
+                ))
+
+    with replaced_atomically(lexicon_path) as tmp_path:
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.executescript(_SCHEMA)
+            conn.executemany("INSERT INTO form VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", source_meta(LEXICON_FORMAT, dix_path))
+            conn.commit()
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+    return Path(lexicon_path)
+
+
+_lexicon = CompiledSQLite("Lexicon", LEXICON_FORMAT, compile_lexicon, RO_DIX_PATH, LEXICON_PATH)
+
+
+def load_lexicon(dix_path: Path = RO_DIX_PATH, lexicon_path: Path = LEXICON_PATH):
+    """
+    Make the compiled lexicon available, compiling ro.dix first if it is
+    missing or stale; later calls are no-ops.
+    """
+    _lexicon.load(dix_path, lexicon_path)
+
+
+@functools.lru_cache(maxsize=50000)
+def analyze(word: str) -> Optional[Tuple[str, str, Tuple[Tuple[str, str], ...]]]:
+    """
+    (lemma, POS, features) of an attested form, or None if the lexicon does not
+    know it. Ambiguous forms prefer the nominative reading, then dictionary order;
+    capitalised words fall back to their lowercase form.
+    """
+    for surface in dict.fromkeys((word, word.lower())):
+        row = _lexicon.connection().execute("""
+            SELECT lemma, pos, gender, number, definite, "case" FROM form
+            WHERE surface = ? AND analysis
+            ORDER BY "case" IS NOT 'Acc,Nom', rowid LIMIT 1
+        """, (surface,)).fetchone()
+        if row is not None:
+            lemma, pos, *values = row
+            feats = tuple(
+                (name, value)
+                for name, value in zip(("Gender", "Number", "Definite", "Case"), values)
+                if value is not None
+            )
+            return lemma, pos, feats
+    return None
+
+
+def analyze_words(words: List[str]) -> List[Optional[Tuple[str, str, Dict[str, str]]]]:
+    # Same shape as src.nlp.word_morphology, so callers can use either
+    results = []
+    for word in words:
+        found = analyze(word)
+        results.append((found[0], found[1], dict(found[2])) if found else None)
+    return results
+
+
+@functools.lru_cache(maxsize=50000)
+def noun_gender(lemma: str) -> Optional[str]:
+    row = _lexicon.connection().execute(
+        "SELECT gender FROM form WHERE lemma = ? AND pos = 'NOUN' AND gender IS NOT NULL LIMIT 1",
+        (lemma,),
+    ).fetchone()
+    return row[0] if row else None
+
+
+@functools.lru_cache(maxsize=50000)
+def _noun_form(lemma: str, number: Optional[str], definite: Optional[str], case: Optional[str]) -> Optional[str]:
+    row = _lexicon.connection().execute("""
+        SELECT surface FROM form
+        WHERE lemma = ? AND pos = 'NOUN' AND number IS ? AND definite IS ? AND "case" IS ? AND generation
+        ORDER BY rowid LIMIT 1
+    """, (lemma, number, definite, case)).fetchone()
+    return row[0] if row else None
+
+
+def inflect_noun(lemma: str, feats: Dict[str, str]) -> Optional[str]:
+    """
+    The attested form of noun `lemma` with the Number, Definite and Case of
+    `feats` (nominative when no case is given), or None if the lexicon has none.
+    """
+    case = feats.get("Case") or "Acc,Nom"
+    return _noun_form(lemma, feats.get("Number"), feats.get("Definite") or "Ind", case)
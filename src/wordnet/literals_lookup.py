@@ -1,64 +1,191 @@
+import functools
+import sqlite3
 import xml.etree.ElementTree as ET
-from pathlib import Path
 from collections import defaultdict
+from pathlib import Path
 
-ROW_XML_PATH = Path(__file__).resolve().parents[2] / "src" / "wordnet" / "extract" / "rown.xml"
-
-
-_literal_to_synsets: dict[str, set[str]] = defaultdict(set)
-_synset_to_literals: dict[str, list[str]] = {}
-_synset_to_hypernyms: dict[str, list[str]] = defaultdict(list)
-
-
-def _load_rown(xml_path: Path = ROW_XML_PATH):
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
-
-    for syn in root.findall("SYNSET"):
-        sid = syn.find("ID").text
-        # collect all literal forms in this synset
-        lits = [lit.text for lit in syn.findall("./SYNONYM/LITERAL")]
-        _synset_to_literals[sid] = lits
-        # for each literal, note it lives in this synset
-        for lit in lits:
-            _literal_to_synsets[lit].add(sid)
-        # collect hypernym links
-        for ilr in syn.findall("ILR"):
-            if ilr.find("TYPE").text == "hypernym":
-                _synset_to_hypernyms[sid].append(ilr.text)
-
+from src.artifacts import CompiledSQLite, replaced_atomically, source_meta
 
-# load once at import time
-_load_rown()
+ROW_XML_PATH = Path(__file__).resolve().parents[2] / "src" / "wordnet" / "extract" / "rown.xml"
+# Compiled, indexed form of rown.xml produced by extract/compile_rown.py
+ROWN_INDEX_PATH = ROW_XML_PATH.with_suffix(".sqlite")
+INDEX_FORMAT = 2
+# Ancestors further up than this are not precomputed (the taxonomy is rarely deeper)
+CLOSURE_MAX_DEPTH = 16
+
+# Literals and synset ids are interned once; the relations only hold integer ids.
+# Every lookup below is a primary-key or index search.
+_SCHEMA = """
+CREATE TABLE meta    (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE literal (id INTEGER PRIMARY KEY, text TEXT NOT NULL UNIQUE);
+CREATE TABLE synset  (id INTEGER PRIMARY KEY, sid TEXT NOT NULL UNIQUE);
+CREATE TABLE member  (literal INTEGER NOT NULL, synset INTEGER NOT NULL,
+                      PRIMARY KEY (literal, synset)) WITHOUT ROWID;
+CREATE INDEX member_by_synset ON member (synset, literal);
+CREATE TABLE hypernym (synset INTEGER NOT NULL, hypernym INTEGER NOT NULL,
+                       PRIMARY KEY (synset, hypernym)) WITHOUT ROWID;
+CREATE INDEX hypernym_by_target ON hypernym (hypernym, synset);
+CREATE TABLE closure (synset INTEGER NOT NULL, ancestor INTEGER NOT NULL, depth INTEGER NOT NULL,
+                      PRIMARY KEY (synset, ancestor)) WITHOUT ROWID;
+CREATE INDEX closure_by_ancestor ON closure (ancestor, depth, synset);
+"""
+
+
+def compile_rown(xml_path: Path = ROW_XML_PATH, index_path: Path = ROWN_INDEX_PATH) -> Path:
+    """
+    Stream rown.xml into a read-only SQLite index.
+    """
+    with replaced_atomically(index_path) as tmp_path:
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.executescript(_SCHEMA)
+            literals: dict[str, int] = {}
+            synsets: dict[str, int] = {}
+            parents: dict[int, list[int]] = defaultdict(list)
+
+            def intern(table, column, ids, value):
+                if value not in ids:
+                    ids[value] = len(ids) + 1
+                    conn.execute(f"INSERT INTO {table} (id, {column}) VALUES (?, ?)", (ids[value], value))
+                return ids[value]
+
+            for _, syn in ET.iterparse(xml_path):
+                if syn.tag != "SYNSET":
+                    continue
+                sid = intern("synset", "sid", synsets, syn.find("ID").text)
+                for lit in syn.findall("./SYNONYM/LITERAL"):
+                    if lit.text:
+                        conn.execute(
+                            "INSERT OR IGNORE INTO member VALUES (?, ?)",
+                            (intern("literal", "text", literals, lit.text), sid),
+                        )
+                for ilr in syn.findall("ILR"):
+                    if ilr.find("TYPE").text == "hypernym":
+                        parent = intern("synset", "sid", synsets, ilr.text)
+                        conn.execute("INSERT OR IGNORE INTO hypernym VALUES (?, ?)", (sid, parent))
+                        parents[sid].append(parent)
+                syn.clear()
+
+            conn.executemany("INSERT INTO closure VALUES (?, ?, ?)", _closure_rows(parents))
+
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", source_meta(INDEX_FORMAT, xml_path))
+            conn.commit()
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+    return Path(index_path)
+
+
+def _closure_rows(parents: dict[int, list[int]]):
+    # Transitive hypernyms of every synset with their shortest distance, by BFS
+    for synset in list(parents):
+        seen = {synset}
+        frontier = [synset]
+        for depth in range(1, CLOSURE_MAX_DEPTH + 1):
+            frontier = [p for s in frontier for p in parents.get(s, ()) if p not in seen]
+            if not frontier:
+                break
+            frontier = list(dict.fromkeys(frontier))
+            seen.update(frontier)
+            for ancestor in frontier:
+                yield synset, ancestor, depth
+
+
+# One read-only connection per thread; the file is immutable, so the OS
+# page cache (and the mmap) is shared by every thread and worker process.
+_index = CompiledSQLite("RoWordNet index", INDEX_FORMAT, compile_rown, ROW_XML_PATH, ROWN_INDEX_PATH,
+                        mmap_size=256 << 20)
+
+
+def load_rown(xml_path: Path = ROW_XML_PATH, index_path: Path = ROWN_INDEX_PATH):
+    """
+    Make the compiled index available, compiling rown.xml first if the index is
+    missing or stale; later calls are no-ops.
+    """
+    _index.load(xml_path, index_path)
+
+
+def _texts(query: str, *params) -> list[str]:
+    return sorted({row[0] for row in _index.connection().execute(query, params)})
 
 
 def get_synonyms(word: str) -> list[str]:
-    syns = set()
-    for sid in _literal_to_synsets.get(word, []):
-        for lit in _synset_to_literals.get(sid, []):
-            if lit != word:
-                syns.add(lit)
-    return sorted(syns)
+    return _texts("""
+        SELECT other.text FROM literal AS l
+        JOIN member AS m ON m.literal = l.id
+        JOIN member AS syn ON syn.synset = m.synset
+        JOIN literal AS other ON other.id = syn.literal
+        WHERE l.text = ? AND other.text != ?
+    """, word, word)
 
 
 def get_hypernyms(word: str) -> list[str]:
-    hypers = set()
-    for sid in _literal_to_synsets.get(word, []):
-        for hyper_sid in _synset_to_hypernyms.get(sid, []):
-            for lit in _synset_to_literals.get(hyper_sid, []):
-                hypers.add(lit)
-    return sorted(hypers)
+    return _texts("""
+        SELECT other.text FROM literal AS l
+        JOIN member AS m ON m.literal = l.id
+        JOIN hypernym AS h ON h.synset = m.synset
+        JOIN member AS hm ON hm.synset = h.hypernym
+        JOIN literal AS other ON other.id = hm.literal
+        WHERE l.text = ?
+    """, word)
 
 
 # optional: reverse lookup
 def get_hyponyms(word: str) -> list[str]:
-    hypos = set()
-    target_sids = _literal_to_synsets.get(word, set())
-    for sid, hyper_list in _synset_to_hypernyms.items():
-        if any(h in target_sids for h in hyper_list):
-            for lit in _synset_to_literals.get(sid, []):
-                hypos.add(lit)
-    return sorted(hypos)
+    return _texts("""
+        SELECT other.text FROM literal AS l
+        JOIN member AS m ON m.literal = l.id
+        JOIN hypernym AS h ON h.hypernym = m.synset
+        JOIN member AS hm ON hm.synset = h.synset
+        JOIN literal AS other ON other.id = hm.literal
+        WHERE l.text = ?
+    """, word)
+
+
+# Bounded-depth taxonomy queries. Both directions read the precomputed closure
+# (by synset for hypernyms, by ancestor for hyponyms) and are memoized per word.
+_CLOSURE_QUERIES = {
+    "hypernyms": """
+        SELECT other.text, MIN(c.depth) FROM literal AS l
+        JOIN member AS m ON m.literal = l.id
+        JOIN closure AS c ON c.synset = m.synset
+        JOIN member AS cm ON cm.synset = c.ancestor
+        JOIN literal AS other ON other.id = cm.literal
+        WHERE l.text = ? AND c.depth <= ? AND other.text != l.text
+        GROUP BY other.text
+    """,
+    "hyponyms": """
+        SELECT other.text, MIN(c.depth) FROM literal AS l
+        JOIN member AS m ON m.literal = l.id
+        JOIN closure AS c ON c.ancestor = m.synset
+        JOIN member AS cm ON cm.synset = c.synset
+        JOIN literal AS other ON other.id = cm.literal
+        WHERE l.text = ? AND c.depth <= ? AND other.text != l.text
+        GROUP BY other.text
+    """,
+}
+
+
+@functools.lru_cache(maxsize=8192)
+def _closure(word: str, direction: str, max_depth: int) -> tuple[tuple[str, int], ...]:
+    rows = _index.connection().execute(_CLOSURE_QUERIES[direction], (word, max_depth))
+    return tuple(sorted(rows, key=lambda row: (row[1], row[0])))
+
+
+def get_hypernyms_within(word: str, max_depth: int = 2) -> list[str]:
+    """
+    Literals of all hypernyms up to `max_depth` levels above the word's synsets,
+    nearest levels first (alphabetical within a level).
+    """
+    return [text for text, _ in _closure(word, "hypernyms", min(max_depth, CLOSURE_MAX_DEPTH))]
+
+
+def get_hyponyms_within(word: str, max_depth: int = 2) -> list[str]:
+    """
+    Literals of all hyponyms up to `max_depth` levels below the word's synsets,
+    nearest levels first (alphabetical within a level).
+    """
+    return [text for text, _ in _closure(word, "hyponyms", min(max_depth, CLOSURE_MAX_DEPTH))]
 
 
 if __name__ == "__main__":
@@ -68,4 +195,4 @@ if __name__ == "__main__":
         print(" Synonyms:   ", get_synonyms(w))
         print(" Hypernyms:  ", get_hypernyms(w))
         print(" Hyponyms:   ", get_hyponyms(w))
-        
\ No newline at end of file
+        print(" Hyponyms ≤2:", get_hyponyms_within(w, 2))
@@ -1,12 +1,15 @@
 import sys
 import pathlib
-import spacy
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
 sys.path.append(str(pathlib.Path(__file__).parent.parent.parent.resolve()))
-from src.wordnet.literals_lookup import get_synonyms, get_hypernyms, get_hyponyms
+from src.wordnet.literals_lookup import get_synonyms, get_hypernyms_within, get_hyponyms_within
+from src.wordnet.lexicon import analyze_words, inflect_noun, noun_gender
+from src.nlp import word_morphology
 
-nlp = spacy.load("ro_core_news_sm")
+# Words the compiled lexicon does not know are analysed with spaCy only when this is on;
+# by default the /synonym path never loads a spaCy model.
+SPACY_FALLBACK = False
 
 
 def reinflect_noun(lemma: str, feats: Dict[str,str]) -> str:
@@ -49,61 +52,59 @@ def reinflect(cand: str, input_feats: Dict[str,str], input_pos: str) -> str:
     if input_pos != "NOUN":
         return cand  # only nouns supported
 
-    # get gender
-    doc2 = nlp(cand)
-    if not doc2 or not doc2[0].has_morph:
-        gen = None
-    else:
-        gen = doc2[0].morph.get("Gender")
-        gen = gen[0] if gen else None
+    # attested form first; the suffix rules only cover words missing from the lexicon
+    form = inflect_noun(cand, input_feats)
+    if form is not None:
+        return form
 
     feats = {
         "Number":   input_feats.get("Number"),
         "Definite": input_feats.get("Definite"),
-        "Gender":   gen or "Masc"  # default to Masc if unknown
+        "Gender":   noun_gender(cand) or "Masc"  # default to Masc if unknown
     }
 
     return reinflect_noun(cand, feats)
 
 
-def related_forms(word_form: str) -> Dict[str, List[str]]:
-    doc = nlp(word_form)
-    if not doc or not doc[0].has_morph:
-        lemma = word_form
-        return {
-            "input":     word_form,
-            "lemma":     lemma,
+def analyze_forms(words: List[str]) -> List[Optional[Tuple[str, str, Dict[str, str]]]]:
+    # (lemma, POS, features) from the lexicon; spaCy only for the leftovers, if enabled
+    results = analyze_words(words)
+    unknown = [i for i, morph in enumerate(results) if morph is None]
+    if SPACY_FALLBACK and unknown:
+        for i, morph in zip(unknown, word_morphology([words[i] for i in unknown])):
+            results[i] = morph
+    return results
+
+
+def related_forms_many(word_forms: List[str], depth: int = 1) -> List[Dict[str, List[str]]]:
+    # depth > 1 also walks hypernyms/hyponyms of the hypernyms/hyponyms (nearest levels first).
+    # Analysis and reinflection are lookups in the compiled lexicon (see lexicon.py).
+    outputs = []
+    for word_form, morph in zip(word_forms, analyze_forms(word_forms)):
+        lemma, pos, feats = morph if morph else (word_form, None, {})
+        related = {
             "synonyms":  get_synonyms(lemma),
-            "hypernyms": get_hypernyms(lemma),
-            "hyponyms":  get_hyponyms(lemma),
+            "hypernyms": get_hypernyms_within(lemma, depth),
+            "hyponyms":  get_hyponyms_within(lemma, depth),
         }
+        if pos is not None:
+            related = {key: [reinflect(cand, feats, pos) for cand in cands] for key, cands in related.items()}
+        outputs.append({"input": word_form, "lemma": lemma, **related})
+    return outputs
 
-    tok   = doc[0]
-    lemma = tok.lemma_
-    feats = tok.morph.to_dict()
-    pos   = tok.pos_
-
-    out = {
-        "input":     word_form,
-        "lemma":     lemma,
-        "synonyms":  [],
-        "hypernyms": [],
-        "hyponyms":  [],
-    }
 
-    for fn, key in (
-        (get_synonyms,  "synonyms"),
-        (get_hypernyms, "hypernyms"),
-        (get_hyponyms,  "hyponyms"),
-    ):
-        for cand in fn(lemma):
-            out[key].append(reinflect(cand, feats, pos))
+def related_forms(word_form: str, depth: int = 1) -> Dict[str, List[str]]:
+    return related_forms_many([word_form], depth)[0]
+
+def _pick(data: Dict[str, List[str]], depth: int) -> List[str]:
+    # one hypernym and one hyponym per level of depth, nearest first
+    return data.get("synonyms", [])[:3] + data.get("hypernyms", [])[:depth] + data.get("hyponyms", [])[:depth]
 
-    return out
+def get_related_forms(word_form: str, depth: int = 1) -> List[str]:
+    return _pick(related_forms(word_form, depth), depth)
 
-def get_related_forms(word_form: str) -> str:
-    data = related_forms(word_form)
-    return data.get("synonyms", [])[:3] + data.get("hypernyms", [])[:1] + data.get("hyponyms", [])[:1]
+def get_related_forms_many(word_forms: List[str], depth: int = 1) -> List[List[str]]:
+    return [_pick(data, depth) for data in related_forms_many(word_forms, depth)]
 
 if __name__ == "__main__":
     # Test example 
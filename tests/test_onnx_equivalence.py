@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+pytest.importorskip("optimum")
+import torch
+
+from src.evaluate_quantization import DEV_PATH, read_pairs
+from src.models import generate_corrections_batch, load_model
+from src.quantize_model import ROOT
+
+MODEL_PATH = ROOT / "t5-grammar-finetuned"
+LIMIT = 50
+NUM_SUGGESTIONS = 3
+ATOL = 1e-3
+MIN_AGREEMENT = 0.98
+
+
+def encoder_difference(torch_model, onnx_model, tokenizer, texts) -> float:
+    # Largest absolute difference between the encoder outputs of both backends
+    inputs = tokenizer(["grammar: " + t for t in texts], return_tensors="pt", padding=True)
+    with torch.inference_mode():
+        expected = torch_model.get_encoder()(**inputs).last_hidden_state
+        actual = onnx_model.encoder(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"]).last_hidden_state
+    mask = inputs["attention_mask"].unsqueeze(-1).bool()
+    return (expected - actual).abs().masked_select(mask).max().item()
+
+
+@pytest.fixture(scope="module")
+def models():
+    try:
+        torch_model, tokenizer = load_model(str(MODEL_PATH))
+    except Exception as exc:
+        pytest.skip(f"{MODEL_PATH} weights are not available: {exc}")
+    torch_model.to("cpu")
+    onnx_model, _ = load_model(str(MODEL_PATH), backend="onnx")
+    return torch_model, onnx_model, tokenizer
+
+
+@pytest.fixture(scope="module")
+def texts():
+    if not Path(DEV_PATH).exists():
+        pytest.skip(f"{DEV_PATH} is not available")
+    return [wrong for _, wrong in read_pairs(Path(DEV_PATH), LIMIT)]
+
+
+def test_encoder_outputs_match(models, texts):
+    torch_model, onnx_model, tokenizer = models
+    assert encoder_difference(torch_model, onnx_model, tokenizer, texts[:8]) <= ATOL
+
+
+def test_suggestions_match(models, texts):
+    torch_model, onnx_model, tokenizer = models
+    expected = generate_corrections_batch(torch_model, tokenizer, texts, num_suggestions=NUM_SUGGESTIONS)
+    actual = generate_corrections_batch(onnx_model, tokenizer, texts, num_suggestions=NUM_SUGGESTIONS)
+    mismatches = [(t, e, a) for t, e, a in zip(texts, expected, actual) if e != a]
+    agreement = 1 - len(mismatches) / len(texts)
+    assert agreement >= MIN_AGREEMENT, "\n".join(f"{t}\n  torch: {e}\n  onnx:  {a}" for t, e, a in mismatches)